@@ -1,3 +1,5 @@
+from typing import List
+
 try:
     from pydantic_settings import BaseSettings
 except ImportError:
@@ -13,6 +15,29 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
     API_BASE_URL: str = "http://127.0.0.1:8000"
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 500
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_EXCLUDE_PATHS: List[str] = []
+    METRICS_ENABLED: bool = True
+    QUERY_STATS_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 10
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 1.0
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_MAX_STORED: int = 200
+    DATA_VERSION_BACKEND: str = "memory"  # "database" to share versions between workers
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT: float = 30.0
+    FX_RATES_URL: str = "https://api.exchangerate-api.com/v4/latest/{base}"
+    FX_CACHE_TTL: float = 3600.0
+    FX_CACHE_PATH: str = "./fx_rates.json"
+    FX_TIMEOUT: float = 10.0
+    CATEGORIZER_NAIVE_BAYES: bool = True
+    CATEGORIZER_HISTORY_ROWS: int = 20_000
+    CATEGORIZER_CACHE_SIZE: int = 256
+    UNREAD_COUNT_CACHE_SIZE: int = 10_000
 
     class Config:
 
@@ -1,8 +1,12 @@
+from sqlalchemy import Row, case, func, insert, select, update
 from sqlalchemy.orm import Session
 from app import models, schemas
-from typing import List, Optional, Union
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
 from uuid import UUID, uuid4
 from datetime import date, datetime
+from itertools import islice
+from app.services import alerts, events
+from app.services.versioning import data_versions
 
 
 def create_user(db: Session, user: schemas.UserCreate, hashed_password: str) -> models.User:
@@ -39,6 +43,7 @@ def update_user(db: Session, user_id: str, user_update: schemas.UserUpdate) -> O
         setattr(db_user, key, value)
     db.add(db_user)
     db.commit()
+    data_versions.bump(user_id)
     db.refresh(db_user)
     return db_user
 
@@ -52,25 +57,182 @@ def create_transaction(
         category=transaction.category,
         description=transaction.description,
         method=transaction.method,
+        currency=transaction.currency,
         date=transaction.date,
     )
     db.add(db_transaction)
+    db.flush()
+    changes = alerts.spend_changes(db, user_id, None, db_transaction)
+    notifications = alerts.record_spend(db, user_id, changes)
     db.commit()
+    data_versions.bump(user_id)
     db.refresh(db_transaction)
+    events.transaction_changed(
+        db, user_id, "transaction.created", events.transaction_delta(db_transaction), changes
+    )
+    _publish_notifications(user_id, notifications)
     return db_transaction
 
 
+def import_transactions(db: Session, user_id: str, rows: Iterable[dict], batch_size: int = 1000) -> int:
+    """Insert ``transactions`` rows from an iterable in batches, committing each one.
+
+    Rows are consumed as they are inserted, so a generator over a large file
+    never has to fit in memory. Budget totals and alerts are updated per batch.
+    Returns the number of rows inserted.
+    """
+    rows = iter(rows)
+    imported = 0
+    # (category, date) -> change in expense total, for live budget progress.
+    spend_deltas: dict = {}
+    notifications: List[models.Notification] = []
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        db.execute(insert(models.Transaction), batch)
+        changes = alerts.convert_changes(db, user_id, [
+            (row["category"], row["date"], row["amount"], row.get("currency"))
+            for row in batch if row["type"] == "expense"
+        ])
+        for category, day, amount in changes:
+            spend_deltas[(category, day)] = spend_deltas.get((category, day), 0.0) + amount
+        notifications += alerts.record_spend(db, user_id, changes)
+        db.commit()
+        imported += len(batch)
+    if imported:
+        data_versions.bump(user_id)
+        events.transaction_changed(
+            db, user_id, "transactions.imported", {"count": imported},
+            [(category, day, amount) for (category, day), amount in spend_deltas.items()],
+        )
+        _publish_notifications(user_id, notifications)
+    return imported
+
+
+def _publish_notifications(user_id: str, notifications: List[models.Notification]) -> None:
+    for notification in notifications:
+        events.resource_changed(user_id, "notification.created", notification.id)
+
+
+def _query(db: Session, model, fields: Optional[Sequence[str]]):
+    """Query whole rows, or only ``fields`` as plain rows when a subset is requested."""
+    if fields:
+        return db.query(*(getattr(model, name) for name in fields))
+    return db.query(model)
+
+
+def _rows(query, fields: Optional[Sequence[str]]) -> list:
+    if fields:
+        return [row._asdict() for row in query.all()]
+    return query.all()
+
+
+def _transaction_filters(
+    user_id: str,
+    category: Optional[str] = None,
+    type: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    search: Optional[str] = None,
+) -> list:
+    """WHERE clauses shared by the transaction list and its count; dates are inclusive."""
+    table = models.Transaction
+    clauses = [table.user_id == user_id]
+    if category:
+        clauses.append(table.category == category)
+    if type:
+        clauses.append(table.type == type)
+    if start_date:
+        clauses.append(table.date >= start_date)
+    if end_date:
+        clauses.append(table.date <= end_date)
+    if search:
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        clauses.append(table.description.ilike(f"%{escaped}%", escape="\\"))
+    return clauses
+
+
 def get_transactions(
-    db: Session, user_id: str, skip: int = 0, limit: int = 100
-) -> List[models.Transaction]:
-    return (
-        db.query(models.Transaction)
-        .filter(models.Transaction.user_id == user_id)
-        .order_by(models.Transaction.date.desc())
+    db: Session,
+    user_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None,
+    oldest_first: bool = False,
+    **filters,
+) -> List[Union[models.Transaction, dict]]:
+    """A page of transactions, newest first; ``filters`` as in ``_transaction_filters``."""
+    date_order = models.Transaction.date.asc() if oldest_first else models.Transaction.date.desc()
+    id_order = models.Transaction.id.asc() if oldest_first else models.Transaction.id.desc()
+    query = (
+        _query(db, models.Transaction, fields)
+        .filter(*_transaction_filters(user_id, **filters))
+        .order_by(date_order, id_order)
         .offset(skip)
         .limit(limit)
+    )
+    return _rows(query, fields)
+
+
+def count_transactions(db: Session, user_id: str, **filters) -> int:
+    return (
+        db.query(func.count(models.Transaction.id))
+        .filter(*_transaction_filters(user_id, **filters))
+        .scalar()
+    )
+
+
+def get_transaction_categories(db: Session, user_id: str) -> List[str]:
+    rows = (
+        db.query(models.Transaction.category)
+        .filter(models.Transaction.user_id == user_id)
+        .distinct()
+        .order_by(models.Transaction.category)
         .all()
     )
+    return [category for (category,) in rows]
+
+
+def iter_transaction_rows(
+    db: Session,
+    user_id: str,
+    columns: Sequence[str],
+    batch_size: int = 1000,
+    default_currency: Optional[str] = None,
+    **filters,
+) -> Iterator[Sequence[Row]]:
+    """Yield batches of plain rows from a server-side cursor, newest first.
+
+    With ``default_currency``, rows without a currency report that one instead of NULL.
+    """
+    selected = [getattr(models.Transaction, name) for name in columns]
+    if default_currency and "currency" in columns:
+        index = list(columns).index("currency")
+        selected[index] = func.coalesce(models.Transaction.currency, default_currency).label("currency")
+    query = (
+        select(*selected)
+        .where(*_transaction_filters(user_id, **filters))
+        .order_by(models.Transaction.date.desc(), models.Transaction.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(query).partitions()
+
+
+def get_category_history(db: Session, user_id: str, recent: int = 20_000) -> List[Row]:
+    """(description, category, count) over the user's ``recent`` newest described transactions."""
+    tx = models.Transaction
+    latest = (
+        select(tx.description, tx.category)
+        .where(tx.user_id == user_id, tx.description.isnot(None))
+        .order_by(tx.id.desc())
+        .limit(recent)
+        .subquery()
+    )
+    query = select(latest.c.description, latest.c.category, func.count()).group_by(
+        latest.c.description, latest.c.category
+    )
+    return db.execute(query).all()
 
 
 def get_transaction(db: Session, user_id: str, transaction_id: int) -> Optional[models.Transaction]:
@@ -87,21 +249,72 @@ def update_transaction(
     db_transaction = get_transaction(db, user_id, transaction_id)
     if not db_transaction:
         return None
+    before = events.transaction_delta(db_transaction)
     update_data = transaction_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_transaction, key, value)
     db.add(db_transaction)
+    goal_ids = _follow_transaction_amount(db, transaction_id, db_transaction.amount - before["amount"])
+    db.flush()
+    changes = alerts.spend_changes(db, user_id, before, db_transaction)
+    notifications = alerts.record_spend(db, user_id, changes)
     db.commit()
+    data_versions.bump(user_id)
     db.refresh(db_transaction)
+    events.transaction_changed(
+        db, user_id, "transaction.updated", events.transaction_delta(db_transaction), changes
+    )
+    for goal_id in goal_ids:
+        events.goal_changed(user_id, "goal.updated", get_goal(db, user_id, goal_id))
+    _publish_notifications(user_id, notifications)
     return db_transaction
 
 
+def _follow_transaction_amount(db: Session, transaction_id: int, change: float) -> List[int]:
+    """Move the contributions funded by a transaction by its amount change; return the goals touched.
+
+    A contribution reduced to nothing is removed.
+    """
+    if not change:
+        return []
+    contributions = (
+        db.query(models.GoalContribution)
+        .filter(models.GoalContribution.transaction_id == transaction_id)
+        .all()
+    )
+    for contribution in contributions:
+        amount = max(contribution.amount + change, 0.0)
+        _apply_contribution(db, contribution.goal_id, amount - contribution.amount)
+        if amount:
+            contribution.amount = amount
+        else:
+            db.delete(contribution)
+    return sorted({contribution.goal_id for contribution in contributions})
+
+
 def delete_transaction(db: Session, user_id: str, transaction_id: int) -> bool:
     db_transaction = get_transaction(db, user_id, transaction_id)
     if not db_transaction:
         return False
+    before = events.transaction_delta(db_transaction)
+    contributions = (
+        db.query(models.GoalContribution)
+        .filter(models.GoalContribution.transaction_id == transaction_id)
+        .all()
+    )
+    # Contributions funded by this transaction go with it, and so does their progress.
+    for contribution in contributions:
+        _apply_contribution(db, contribution.goal_id, -contribution.amount)
+        db.delete(contribution)
     db.delete(db_transaction)
+    db.flush()
+    changes = alerts.spend_changes(db, user_id, before, None)
+    alerts.record_spend(db, user_id, changes)
     db.commit()
+    data_versions.bump(user_id)
+    events.transaction_changed(db, user_id, "transaction.deleted", before, changes)
+    for goal_id in {contribution.goal_id for contribution in contributions}:
+        events.goal_changed(user_id, "goal.updated", get_goal(db, user_id, goal_id))
     return True
 
 
@@ -127,13 +340,18 @@ def create_budget(db: Session, user_id: str, budget: schemas.BudgetCreate) -> mo
         period=budget.period,
     )
     db.add(db_budget)
+    alerts.forget_spend(db, user_id, db_budget.category, db_budget.period)
     db.commit()
+    data_versions.bump(user_id)
     db.refresh(db_budget)
+    events.resource_changed(user_id, "budget.created", db_budget.id)
     return db_budget
 
 
-def get_budgets(db: Session, user_id: str) -> List[models.Budget]:
-    return db.query(models.Budget).filter(models.Budget.user_id == user_id).all()
+def get_budgets(
+    db: Session, user_id: str, fields: Optional[Sequence[str]] = None
+) -> List[Union[models.Budget, dict]]:
+    return _rows(_query(db, models.Budget, fields).filter(models.Budget.user_id == user_id), fields)
 
 
 def get_budget(db: Session, user_id: str, budget_id: int) -> Optional[models.Budget]:
@@ -149,20 +367,27 @@ def update_budget(
     db_budget = get_budget(db, user_id, budget_id)
     if not db_budget:
         return None
+    alerts.forget_spend(db, user_id, db_budget.category, db_budget.period)
     update_data = budget_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_budget, key, value)
     db.add(db_budget)
+    alerts.forget_spend(db, user_id, db_budget.category, db_budget.period)
     db.commit()
+    data_versions.bump(user_id)
     db.refresh(db_budget)
+    events.resource_changed(user_id, "budget.updated", db_budget.id)
     return db_budget
 
 def delete_budget(db: Session, user_id: str, budget_id: int) -> bool:
     db_budget = get_budget(db, user_id, budget_id)
     if not db_budget:
         return False
+    alerts.forget_spend(db, user_id, db_budget.category, db_budget.period)
     db.delete(db_budget)
     db.commit()
+    data_versions.bump(user_id)
+    events.resource_changed(user_id, "budget.deleted", budget_id)
     return True
 
 def create_goal(db: Session, user_id: str, goal: schemas.GoalCreate) -> models.Goal:
@@ -175,12 +400,16 @@ def create_goal(db: Session, user_id: str, goal: schemas.GoalCreate) -> models.G
     )
     db.add(db_goal)
     db.commit()
+    data_versions.bump(user_id)
     db.refresh(db_goal)
+    events.goal_changed(user_id, "goal.created", db_goal)
     return db_goal
 
 
-def get_goals(db: Session, user_id: str) -> List[models.Goal]:
-    return db.query(models.Goal).filter(models.Goal.user_id == user_id).all()
+def get_goals(
+    db: Session, user_id: str, fields: Optional[Sequence[str]] = None
+) -> List[Union[models.Goal, dict]]:
+    return _rows(_query(db, models.Goal, fields).filter(models.Goal.user_id == user_id), fields)
 
 
 def get_goal(db: Session, user_id: str, goal_id: int) -> Optional[models.Goal]:
@@ -199,11 +428,12 @@ def update_goal(
     update_data = goal_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_goal, key, value)
-    if db_goal.current_amount >= db_goal.target_amount:
-        db_goal.completed = True
+    db_goal.completed = db_goal.current_amount >= db_goal.target_amount
     db.add(db_goal)
     db.commit()
+    data_versions.bump(user_id)
     db.refresh(db_goal)
+    events.goal_changed(user_id, "goal.updated", db_goal)
     return db_goal
 
 
@@ -213,8 +443,74 @@ def delete_goal(db: Session, user_id: str, goal_id: int) -> bool:
         return False
     db.delete(db_goal)
     db.commit()
+    data_versions.bump(user_id)
+    events.resource_changed(user_id, "goal.deleted", goal_id)
     return True
 
+def _apply_contribution(db: Session, goal_id: int, amount: float) -> None:
+    """Move a goal's progress in SQL, so concurrent contributions cannot overwrite each other.
+
+    Progress never drops below zero, whatever was removed.
+    """
+    moved = models.Goal.current_amount + amount
+    new_amount = case((moved < 0, 0.0), else_=moved)
+    db.execute(
+        update(models.Goal)
+        .where(models.Goal.id == goal_id)
+        .values(current_amount=new_amount, completed=new_amount >= models.Goal.target_amount)
+    )
+
+
+def add_goal_contribution(
+    db: Session, user_id: str, goal_id: int, contribution: schemas.GoalContributionCreate
+) -> Optional[models.GoalContribution]:
+    """Record a contribution and update the goal's progress in the same transaction.
+
+    Returns None when the goal, or the linked transaction, is not the user's.
+    """
+    if not get_goal(db, user_id, goal_id):
+        return None
+    if contribution.transaction_id is not None and not get_transaction(db, user_id, contribution.transaction_id):
+        return None
+    db_contribution = models.GoalContribution(goal_id=goal_id, user_id=user_id, **contribution.model_dump())
+    db.add(db_contribution)
+    _apply_contribution(db, goal_id, contribution.amount)
+    db.commit()
+    data_versions.bump(user_id)
+    db.refresh(db_contribution)
+    events.goal_changed(user_id, "goal.updated", get_goal(db, user_id, goal_id))
+    return db_contribution
+
+
+def get_goal_contributions(db: Session, user_id: str, goal_id: int) -> List[models.GoalContribution]:
+    return (
+        db.query(models.GoalContribution)
+        .filter(models.GoalContribution.user_id == user_id, models.GoalContribution.goal_id == goal_id)
+        .order_by(models.GoalContribution.contributed_on.desc(), models.GoalContribution.id.desc())
+        .all()
+    )
+
+
+def delete_goal_contribution(db: Session, user_id: str, goal_id: int, contribution_id: int) -> bool:
+    db_contribution = (
+        db.query(models.GoalContribution)
+        .filter(
+            models.GoalContribution.user_id == user_id,
+            models.GoalContribution.goal_id == goal_id,
+            models.GoalContribution.id == contribution_id,
+        )
+        .first()
+    )
+    if not db_contribution:
+        return False
+    _apply_contribution(db, goal_id, -db_contribution.amount)
+    db.delete(db_contribution)
+    db.commit()
+    data_versions.bump(user_id)
+    events.goal_changed(user_id, "goal.updated", get_goal(db, user_id, goal_id))
+    return True
+
+
 def create_notification(
     db: Session, user_id: str, notification: schemas.NotificationCreate
 ) -> models.Notification:
@@ -225,16 +521,32 @@ def create_notification(
     )
     db.add(db_notification)
     db.commit()
+    data_versions.bump(user_id)
     db.refresh(db_notification)
     return db_notification
 
 
-def get_notifications(db: Session, user_id: str) -> List[models.Notification]:
+def get_notifications(
+    db: Session,
+    user_id: str,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+    unread_only: bool = False,
+) -> List[models.Notification]:
+    """Newest first; pass the last id of a page as ``before_id`` for the next one."""
+    query = db.query(models.Notification).filter(models.Notification.user_id == user_id)
+    if before_id is not None:
+        query = query.filter(models.Notification.id < before_id)
+    if unread_only:
+        query = query.filter(models.Notification.read.is_(False))
+    return query.order_by(models.Notification.id.desc()).limit(limit).all()
+
+
+def count_unread_notifications(db: Session, user_id: str) -> int:
     return (
-        db.query(models.Notification)
-        .filter(models.Notification.user_id == user_id)
-        .order_by(models.Notification.created_at.desc())
-        .all()
+        db.query(func.count(models.Notification.id))
+        .filter(models.Notification.user_id == user_id, models.Notification.read.is_(False))
+        .scalar()
     )
 
 
@@ -249,5 +561,6 @@ def mark_notification_as_read(db: Session, user_id: str, notification_id: int) -
     db_notification.read = True
     db.add(db_notification)
     db.commit()
+    data_versions.bump(user_id)
     db.refresh(db_notification)
     return db_notification
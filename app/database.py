@@ -1,12 +1,24 @@
 """Database connection and session management."""
 
-from sqlalchemy import create_engine
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.config import settings
+from app.services.metrics import DB_POOL_CHECKOUT
 
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+    connect_args=(
+        # ``timeout`` is SQLite's busy timeout: writers from other worker
+        # processes wait for the lock instead of failing immediately.
+        {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT}
+        if "sqlite" in settings.DATABASE_URL else {}
+    ),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -14,9 +26,87 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+@contextmanager
+def _init_lock():
+    """Serialize schema setup between worker processes starting together."""
+    try:
+        import fcntl
+    except ImportError:  # Windows: no multi-process workers to race with
+        yield
+        return
+    key = hashlib.blake2s(settings.DATABASE_URL.encode("utf-8"), digest_size=6).hexdigest()
+    with open(os.path.join(tempfile.gettempdir(), f"finance-tracker-init-{key}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _add_missing_columns(connection):
+    """Add nullable columns that were introduced after a table was created.
+
+    ``create_all`` only creates missing tables; existing databases would
+    otherwise lack columns such as ``transactions.currency``.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable or column.primary_key:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+
+
+def init_db():
+    """Create missing tables and open the first pooled connection.
+
+    Runs from the application lifespan rather than at import, so importing
+    the app (tests, CLI tools, worker spawn) never touches the database.
+    """
+    from app import models  # noqa: F401  (registers the tables on Base)
+
+    with _init_lock():
+        on_disk = engine.url.database not in (None, "", ":memory:")
+        with engine.connect() as connection:
+            if engine.dialect.name == "sqlite" and on_disk and settings.SQLITE_WAL:
+                # WAL lets readers in other workers proceed during a write;
+                # the mode is stored in the database file.
+                connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+            connection.exec_driver_sql("SELECT 1")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            _add_missing_columns(connection)
+
+
 def get_db():
     db = SessionLocal()
+    started = time.perf_counter()
+    # Check out the connection up front so the pool wait can be measured;
+    # every route that depends on a session queries it anyway.
+    db.connection()
+    DB_POOL_CHECKOUT.observe(time.perf_counter() - started)
     try:
         yield db
     finally:
         db.close()
+
+
+def begin_read_snapshot(db):
+    """Start the session's transaction now so all following reads share one snapshot.
+
+    pysqlite only issues BEGIN before a write, so on SQLite each SELECT would
+    otherwise run in its own implicit transaction.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        # The isolation level only applies to a new transaction; nothing has
+        # been written yet, so ending the current one loses nothing.
+        db.rollback()
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        return
+    connection = db.connection()
+    if not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
@@ -1,21 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 
-from app.database import engine, Base, get_db
-from app.routers import auth, transactions, budgets, goals, reports
+from app.database import get_db, init_db
+from app.routers import auth, transactions, budgets, goals, reports, batch, events, admin, notifications
+from app.routers.deps import check_etag
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.profiler import ProfilerMiddleware
 from app.models import User
 from app.schemas import DashboardSummary
 from app.services.reports import ReportGenerator
+from app.services.metrics import REGISTRY
+from app.services import query_stats
 from app.config import settings
-from app import crud
 
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    yield
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="A full-stack personal finance tracker with budget and goal management.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -25,19 +40,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
+)
+
+app.add_middleware(
+    ProfilerMiddleware,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    interval_ms=settings.PROFILE_INTERVAL_MS,
 )
 
+if settings.QUERY_STATS_ENABLED:
+    query_stats.install()
+    app.add_middleware(QueryStatsMiddleware, expose_headers=settings.DEBUG)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        level=settings.COMPRESSION_LEVEL,
+        exclude_paths=settings.COMPRESSION_EXCLUDE_PATHS,
+    )
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(transactions.router)
 app.include_router(budgets.router)
 app.include_router(goals.router)
 app.include_router(reports.router)
+app.include_router(batch.router)
+app.include_router(events.router)
+app.include_router(notifications.router)
+app.include_router(admin.router)
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/info")
 def info():
     return {
@@ -48,31 +94,35 @@ def info():
     }
 
 
-@app.get("/dashboard", response_model=DashboardSummary)
+@app.get("/dashboard", response_model=DashboardSummary, dependencies=[Depends(check_etag)])
 def get_dashboard(
     current_user: User = Depends(auth.get_current_user),
     db: Session = Depends(get_db),
 ):
-    generator = ReportGenerator(db, current_user.id)
-    transactions = generator.get_transactions()
-    
-    total_income = sum(tx.amount for tx in transactions if tx.type == "income")
-    total_expenses = sum(tx.amount for tx in transactions if tx.type == "expense")
-    net_balance = total_income - total_expenses
-    
-    budgets = crud.get_budgets(db, current_user.id)
-    goals = crud.get_goals(db, current_user.id)
-    
-    return DashboardSummary(
-        total_income=total_income,
-        total_expenses=total_expenses,
-        net_balance=net_balance,
-        transaction_count=len(transactions),
-        budget_count=len(budgets),
-        goal_count=len(goals),
-    )
+    return ReportGenerator(db, current_user.id).dashboard_summary()
 
 
-if __name__ == "__main__":
+def serve(argv=None):
+    import argparse
+    import os
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+
+    parser = argparse.ArgumentParser(description="Run the Personal Finance Tracker API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", default="1", help='worker processes, or "auto" for one per CPU core')
+    args = parser.parse_args(argv)
+    workers = (os.cpu_count() or 1) if args.workers == "auto" else int(args.workers)
+
+    if workers == 1:
+        uvicorn.run(app, host=args.host, port=args.port)
+        return
+    # Workers are separate processes: ETag versions must live in the database
+    # to be seen by all of them, and the schema is created once up front.
+    os.environ["DATA_VERSION_BACKEND"] = "database"
+    init_db()
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=workers)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,200 @@
+"""Response compression with gzip, and brotli/zstd when they are installed."""
+
+import zlib
+from typing import Callable, Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+# Server-sent events must reach the client as they are sent, not buffered by a decoder.
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+class _GzipCompressor:
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # A sync flush after every chunk lets streaming clients decode each
+        # chunk as it arrives instead of waiting for the deflate window.
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> Dict[str, Callable]:
+    """Encodings usable in this process, in server preference order."""
+    encodings = {}
+    if zstandard is not None:
+        encodings["zstd"] = _ZstdCompressor
+    if brotli is not None:
+        encodings["br"] = _BrotliCompressor
+    encodings["gzip"] = _GzipCompressor
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, encodings: Iterable[str]) -> Optional[str]:
+    """The accepted encoding with the highest q-value; ``encodings`` order breaks ties.
+
+    ``q=0`` marks an encoding (or ``*``, everything not listed) as not acceptable.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """Compress responses above ``minimum_size`` with the best accepted encoding.
+
+    Paths starting with one of ``exclude_paths`` are never compressed, and a
+    route can opt out by setting its own ``Content-Encoding`` header.
+    Streaming responses are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        level: int = 6,
+        exclude_paths: Iterable[str] = (),
+        encodings: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.exclude_paths = tuple(exclude_paths)
+        available = available_encodings()
+        if encodings is not None:
+            available = {name: available[name] for name in encodings if name in available}
+        self.encodings = available
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate_encoding(accept_encoding, self.encodings) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            send, encoding, self.encodings[encoding], self.level, self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+
+    def __init__(self, send: Send, encoding: str, factory: Callable, level: int, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.factory = factory
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _should_compress(self, headers: Headers) -> bool:
+        if self.start_message["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if content_type.startswith(UNCOMPRESSED_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if not self._should_compress(headers) or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.compressor = self.factory(self.level)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._send(self.start_message)
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
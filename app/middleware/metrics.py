@@ -0,0 +1,52 @@
+"""Request metrics middleware feeding the in-process registry."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS, HTTP_RESPONSE_SIZE
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Record count, latency, in-flight requests and response size per route.
+
+    Routes are labelled by their path template (``/budgets/{budget_id}``), so
+    the number of label values stays bounded. Add it outermost so sizes are
+    measured after compression.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths=("/metrics",)):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path_format", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route_path, status=str(status_code))
+            HTTP_LATENCY.observe(elapsed, method=method, route=route_path)
+            HTTP_RESPONSE_SIZE.observe(size, method=method, route=route_path)
@@ -0,0 +1,99 @@
+"""Opt-in request profiling.
+
+An admin triggers a profile with the ``X-Profile: 1`` header or the
+``profile=1`` query flag; ``PROFILE_SAMPLE_RATE`` additionally profiles that
+fraction of all requests. The profile is stored and its id returned in the
+``X-Profile-Id`` header; admins fetch it from ``/admin/profiles/{id}``.
+Requests that are not profiled only pay for the flag check.
+"""
+
+import random
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import get_db
+from app.routers.auth import get_current_user, require_role
+from app.services.profiler import StackSampler, active_sampler, render, store
+
+_require_admin = require_role("admin")
+
+
+def _profile_requested(scope: Scope) -> bool:
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    if "1" in query.get("profile", []):
+        return True
+    return any(name == b"x-profile" and value == b"1" for name, value in scope["headers"])
+
+
+async def _is_admin(scope: Scope) -> bool:
+    token = None
+    for name, value in scope["headers"]:
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            token = value[7:].decode("latin-1")
+    if not token:
+        return False
+    # Honour dependency overrides (tests) the same way the routes do.
+    db_factory = scope["app"].dependency_overrides.get(get_db, get_db)
+    sessions = db_factory()
+    db = next(sessions)
+    try:
+        await _require_admin(await get_current_user(token, db))
+        return True
+    except HTTPException:
+        return False
+    finally:
+        sessions.close()
+
+
+class ProfilerMiddleware:
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 0.0, interval_ms: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = _profile_requested(scope)
+        sampled = not requested and self.sample_rate > 0 and random.random() < self.sample_rate
+        if not requested and not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        if requested and not await _is_admin(scope):
+            response = JSONResponse({"detail": "Profiling requires an admin token"}, status_code=403)
+            await response(scope, receive, send)
+            return
+
+        sampler = StackSampler(self.interval)
+        title = f"{scope['method']} {scope['path']}"
+        stopped = False
+
+        def finish() -> str:
+            samples = sampler.stop()
+            return store.save(render(samples, title, sampler.duration, self.interval))
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal stopped
+            if message["type"] == "http.response.start" and not stopped:
+                stopped = True
+                profile_id = finish()
+                if requested:
+                    MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        token = active_sampler.set(sampler)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            active_sampler.reset(token)
+            if not stopped:
+                finish()
@@ -0,0 +1,47 @@
+"""Per-request SQL statistics, exposed as response headers in debug mode."""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services import query_stats
+
+
+class QueryStatsMiddleware:
+    """Collect query count and DB time for each request.
+
+    With ``expose_headers`` the totals are added to the response as
+    ``X-DB-Query-Count``, ``X-DB-Time-Ms`` and ``X-DB-N-Plus-One`` (the number
+    of statements repeated past ``N_PLUS_ONE_THRESHOLD``).
+    """
+
+    def __init__(self, app: ASGIApp, expose_headers: bool = False):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = query_stats.start_request()
+        finished = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal finished
+            if message["type"] == "http.response.start":
+                # Regular responses have run all their queries by now;
+                # streaming bodies are counted in the logs and metrics only.
+                suspects = query_stats.finish_request(stats, scope["path"])
+                finished = True
+                if self.expose_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+                    headers["X-DB-N-Plus-One"] = str(len(suspects))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not finished:
+                query_stats.finish_request(stats, scope["path"])
@@ -34,6 +34,7 @@ class Transaction(Base):
     category: str = Column(String(100), nullable=False)
     description: str = Column(String(500))
     method: str = Column(String(100), default="cash") 
+    currency: str = Column(String(3))  # NULL: the user's currency
     date: str = Column(Date, nullable=False, index=True)
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
     user = relationship("User", back_populates="transactions")
@@ -65,6 +66,53 @@ class Goal(Base):
     completed: bool = Column(Boolean, default=False)
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
     user = relationship("User", back_populates="goals")
+    contributions = relationship("GoalContribution", back_populates="goal", cascade="all, delete-orphan")
+
+
+class GoalContribution(Base):
+
+    __tablename__ = "goal_contributions"
+
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
+    goal_id: int = Column(Integer, ForeignKey("goals.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id: str = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    transaction_id: int = Column(Integer, ForeignKey("transactions.id", ondelete="CASCADE"), index=True)
+    amount: float = Column(Float, nullable=False)
+    note: str = Column(String(255))
+    contributed_on: str = Column(Date, nullable=False)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow)
+    goal = relationship("Goal", back_populates="contributions")
+
+
+class BudgetSpend(Base):
+
+    __tablename__ = "budget_spend"
+
+    # Running expense total per category and budget period, kept by the alert engine.
+    user_id: str = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category: str = Column(String(100), primary_key=True)
+    period: str = Column(String(50), primary_key=True)
+    period_start: str = Column(Date, primary_key=True)
+    spent: float = Column(Float, nullable=False, default=0.0)
+
+
+class ExchangeRate(Base):
+
+    __tablename__ = "exchange_rates"
+
+    # Units of ``currency`` per US dollar on ``rate_date``.
+    currency: str = Column(String(3), primary_key=True)
+    rate_date: str = Column(Date, primary_key=True)
+    rate: float = Column(Float, nullable=False)
+
+
+class DataVersion(Base):
+
+    __tablename__ = "data_versions"
+
+    # One row per user, plus an epoch row under the empty key.
+    user_id: str = Column(String(36), primary_key=True)
+    version: int = Column(Integer, nullable=False, default=0)
 
 
 class Notification(Base):
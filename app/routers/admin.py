@@ -0,0 +1,23 @@
+"""Admin-only endpoints for stored request profiles."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from typing import Dict, List
+
+from app.routers.auth import require_role
+from app.services.profiler import store
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_role("admin"))])
+
+
+@router.get("/profiles", response_model=List[Dict])
+def list_profiles():
+    return store.list()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str):
+    profile = store.load(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile
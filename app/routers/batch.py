@@ -0,0 +1,144 @@
+"""Batch endpoint that answers several read requests in one round trip."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from typing import Annotated, Any, Callable, Dict
+from urllib.parse import parse_qs, urlsplit
+
+from app import crud, schemas, models
+from app.database import begin_read_snapshot, get_db
+from app.routers.auth import get_current_user
+from app.routers.deps import sparse_fields
+from app.services import downsample
+from app.services.reports import ReportGenerator
+
+router = APIRouter(tags=["Batch"])
+
+
+def _int_param(params: Dict[str, list], name: str, default: int, minimum: int, maximum: int) -> int:
+    try:
+        value = int(params.get(name, [default])[0])
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{name} must be an integer")
+    if not minimum <= value <= maximum:
+        raise HTTPException(status_code=422, detail=f"{name} must be between {minimum} and {maximum}")
+    return value
+
+
+def _serialize(rows: list, schema, fields) -> Any:
+    return rows if fields else [schema.model_validate(row) for row in rows]
+
+
+def _transaction_filters(params: Dict[str, list]) -> dict:
+    names = schemas.TransactionFilters.model_fields
+    unknown = sorted(set(params) - set(names) - {"skip", "limit", "fields", "order"})
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported parameters: {', '.join(unknown)}")
+    try:
+        filters = schemas.TransactionFilters(**{name: params[name][0] for name in names if name in params})
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    return filters.model_dump()
+
+
+def _list_transactions(generator: ReportGenerator, params: Dict[str, list]) -> Any:
+    skip = _int_param(params, "skip", 0, 0, 10**9)
+    limit = _int_param(params, "limit", 100, 1, 1000)
+    fields = sparse_fields(schemas.TransactionOut)(params.get("fields", [None])[0])
+    order = params.get("order", ["newest"])[0]
+    if order not in ("newest", "oldest"):
+        raise HTTPException(status_code=422, detail="order must be newest or oldest")
+    filters = _transaction_filters(params)
+    transactions = crud.get_transactions(
+        generator.db, generator.user_id, skip, limit, fields, oldest_first=order == "oldest", **filters
+    )
+    return _serialize(transactions, schemas.TransactionOut, fields)
+
+
+def _list_budgets(generator: ReportGenerator, params: Dict[str, list]) -> Any:
+    fields = sparse_fields(schemas.BudgetOut)(params.get("fields", [None])[0])
+    return _serialize(crud.get_budgets(generator.db, generator.user_id, fields), schemas.BudgetOut, fields)
+
+
+def _list_goals(generator: ReportGenerator, params: Dict[str, list]) -> Any:
+    fields = sparse_fields(schemas.GoalOut)(params.get("fields", [None])[0])
+    return _serialize(crud.get_goals(generator.db, generator.user_id, fields), schemas.GoalOut, fields)
+
+
+def _series_params(params: Dict[str, list]) -> tuple:
+    """``max_points`` and ``method``, validated as the report endpoints validate them."""
+    unknown = sorted(set(params) - {"max_points", "method"})
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported parameters: {', '.join(unknown)}")
+    max_points = _int_param(params, "max_points", 0, 10, 10_000) if "max_points" in params else None
+    method = params.get("method", ["lttb"])[0]
+    if method not in downsample.METHODS:
+        raise HTTPException(status_code=422, detail=f"method must be one of {', '.join(downsample.METHODS)}")
+    return max_points, method
+
+
+def _monthly(generator: ReportGenerator, params: Dict[str, list]) -> Any:
+    return generator.monthly_trend(*_series_params(params))
+
+
+def _timeseries(generator: ReportGenerator, params: Dict[str, list]) -> Any:
+    return schemas.TimeSeries(**generator.daily_series(*_series_params(params)))
+
+
+def _summary(generator: ReportGenerator, params: Dict[str, list]) -> Any:
+    return {
+        "income_vs_expenses": generator.income_vs_expenses(),
+        "category_breakdown": generator.category_summary(),
+        "budget_status": generator.budget_status(),
+        "goals": generator.goal_progress(),
+    }
+
+
+# Read endpoints that can run inside a batch, keyed by their path.
+BATCH_HANDLERS: Dict[str, Callable[[ReportGenerator, Dict[str, list]], Any]] = {
+    "/dashboard": lambda generator, params: generator.dashboard_summary(),
+    "/reports/monthly": _monthly,
+    "/reports/timeseries": _timeseries,
+    "/reports/category": lambda generator, params: generator.category_summary(),
+    "/reports/summary": _summary,
+    "/reports/budgets": lambda generator, params: generator.budget_status(),
+    "/reports/goals": lambda generator, params: generator.goal_progress(),
+    "/transactions/": _list_transactions,
+    "/budgets/": _list_budgets,
+    "/goals/": _list_goals,
+}
+
+
+@router.post("/batch", response_model=schemas.BatchResponse)
+def run_batch(
+    batch: schemas.BatchRequest,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    """Run several read requests with one authentication and one DB snapshot.
+
+    All operations share a session and a ReportGenerator. Each report is its
+    own aggregate query, but the user's currency and whether their ledger needs
+    conversion are looked up only once.
+    """
+    user_id = current_user.id
+    begin_read_snapshot(db)
+    generator = ReportGenerator(db, user_id)
+
+    responses = []
+    for operation in batch.requests:
+        url = urlsplit(operation.path)
+        handler = BATCH_HANDLERS.get(url.path)
+        result = schemas.BatchResult(id=operation.id, path=operation.path, status=status.HTTP_200_OK)
+        if handler is None:
+            result.status = status.HTTP_404_NOT_FOUND
+            result.body = {"detail": "Not batchable"}
+        else:
+            try:
+                result.body = handler(generator, parse_qs(url.query))
+            except HTTPException as e:
+                result.status = e.status_code
+                result.body = {"detail": e.detail}
+        responses.append(result)
+    return schemas.BatchResponse(responses=responses)
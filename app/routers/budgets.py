@@ -1,12 +1,13 @@
 """Budgets router for CRUD operations."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
 from app import crud, schemas, models
 from app.database import get_db
 from app.routers.auth import get_current_user
+from app.routers.deps import check_etag, sparse_fields, sparse_response
 
 router = APIRouter(prefix="/budgets", tags=["Budgets"])
 
@@ -20,12 +21,15 @@ def create_budget(
     return crud.create_budget(db, current_user.id, budget)
 
 
-@router.get("/", response_model=List[schemas.BudgetOut])
+@router.get("/", response_model=List[schemas.BudgetOut], dependencies=[Depends(check_etag)])
 def list_budgets(
+    response: Response,
     current_user: Annotated[models.User, Depends(get_current_user)],
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(schemas.BudgetOut))],
     db: Session = Depends(get_db),
 ):
-    return crud.get_budgets(db, current_user.id)
+    budgets = crud.get_budgets(db, current_user.id, fields)
+    return sparse_response(budgets, response) if fields else budgets
 
 
 @router.get("/{budget_id}", response_model=schemas.BudgetOut)
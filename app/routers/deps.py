@@ -0,0 +1,80 @@
+"""Shared dependencies for API routers."""
+
+import hashlib
+from datetime import date
+from typing import Annotated, List, Optional, Type
+
+from fastapi import Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app import models
+from app.routers.auth import get_current_user
+from app.services.metrics import CACHE_REQUESTS
+from app.services.versioning import data_versions
+
+
+def build_etag(user_id: str) -> str:
+    # Reports such as goal days_left depend on today's date, so the day is
+    # part of the tag alongside the user's data version.
+    user_tag = hashlib.blake2s(user_id.encode("utf-8"), digest_size=4).hexdigest()
+    version = data_versions.get(user_id)
+    return f'W/"{data_versions.epoch}-{user_tag}-{version}-{date.today().isoformat()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any((tag[2:] if tag.startswith("W/") else tag) == bare for tag in candidates)
+
+
+def check_etag(
+    request: Request,
+    response: Response,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+) -> str:
+    """Answer 304 before the endpoint runs when the client's copy is current."""
+    etag = build_etag(current_user.id)
+    headers = {"ETag": etag, "Vary": "Authorization"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        CACHE_REQUESTS.inc(cache="etag", result="hit")
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    CACHE_REQUESTS.inc(cache="etag", result="miss")
+    response.headers.update(headers)
+    return etag
+
+
+def sparse_fields(schema: Type[BaseModel]):
+    """Build a dependency that parses ``?fields=a,b`` against ``schema``'s fields."""
+    allowed = list(schema.model_fields)
+
+    def parse_fields(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(allowed)}"),
+    ) -> Optional[List[str]]:
+        if not fields:
+            return None
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in allowed]
+        if unknown or not names:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested",
+            )
+        return names
+
+    return parse_fields
+
+
+def sparse_response(rows: List[dict], response: Optional[Response] = None) -> JSONResponse:
+    """Serialize narrowed rows directly, since they do not satisfy the full response model.
+
+    ``response`` carries headers set by other dependencies, such as the ETag.
+    """
+    headers = {}
+    if response is not None:
+        headers = {name: value for name, value in response.headers.items() if name in ("etag", "vary", "x-total-count")}
+    return JSONResponse(jsonable_encoder(rows), headers=headers)
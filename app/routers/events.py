@@ -0,0 +1,60 @@
+"""Server-Sent Events stream of live data changes."""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Annotated
+
+from app import models
+from app.database import get_db
+from app.routers.auth import get_current_user
+from app.services.events import bus
+from app.services.versioning import data_versions
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+KEEPALIVE_SECONDS = 15.0
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    """Push transaction, budget and goal deltas as they are written.
+
+    The first event, ``ready``, carries the current data version; a client
+    loads its reports once and then applies the deltas that follow. A
+    ``resync`` event means deltas were dropped and reports must be refetched.
+    """
+    user_id = current_user.id
+    # The stream can stay open for hours; don't hold a pooled connection.
+    db.close()
+
+    async def event_source():
+        subscription = bus.subscribe(user_id)
+        try:
+            yield format_sse("ready", {"version": data_versions.get(user_id)})
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscription.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(message["event"], message["data"])
+        finally:
+            bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
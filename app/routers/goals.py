@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
 from app import crud, schemas, models
 from app.database import get_db
 from app.routers.auth import get_current_user
+from app.routers.deps import check_etag, sparse_fields, sparse_response
 
 router = APIRouter(prefix="/goals", tags=["Goals"])
 
@@ -18,12 +19,50 @@ def create_goal(
     return crud.create_goal(db, current_user.id, goal)
 
 
-@router.get("/", response_model=List[schemas.GoalOut])
+@router.get("/", response_model=List[schemas.GoalOut], dependencies=[Depends(check_etag)])
 def list_goals(
+    response: Response,
     current_user: Annotated[models.User, Depends(get_current_user)],
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(schemas.GoalOut))],
     db: Session = Depends(get_db),
 ):
-    return crud.get_goals(db, current_user.id)
+    goals = crud.get_goals(db, current_user.id, fields)
+    return sparse_response(goals, response) if fields else goals
+
+
+@router.post("/{goal_id}/contributions", response_model=schemas.GoalContributionOut, status_code=201)
+def add_contribution(
+    goal_id: int,
+    contribution: schemas.GoalContributionCreate,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    db_contribution = crud.add_goal_contribution(db, current_user.id, goal_id, contribution)
+    if not db_contribution:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal or transaction not found")
+    return db_contribution
+
+
+@router.get("/{goal_id}/contributions", response_model=List[schemas.GoalContributionOut])
+def list_contributions(
+    goal_id: int,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    if not crud.get_goal(db, current_user.id, goal_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
+    return crud.get_goal_contributions(db, current_user.id, goal_id)
+
+
+@router.delete("/{goal_id}/contributions/{contribution_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_contribution(
+    goal_id: int,
+    contribution_id: int,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    if not crud.delete_goal_contribution(db, current_user.id, goal_id, contribution_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contribution not found")
 
 
 @router.get("/{goal_id}", response_model=schemas.GoalOut)
@@ -0,0 +1,69 @@
+"""Notifications router: keyset-paginated list, unread count and read receipts."""
+
+import threading
+from collections import OrderedDict
+from typing import Annotated, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app import crud, schemas, models
+from app.config import settings
+from app.database import get_db
+from app.routers.auth import get_current_user
+from app.routers.deps import check_etag
+from app.services.metrics import CACHE_REQUESTS
+from app.services.versioning import data_versions
+
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+# user id -> (data version, unread count), least recently used first. Every
+# notification write bumps the user's data version, so a cached count is valid
+# while the version matches.
+_unread_counts: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+_unread_lock = threading.Lock()
+
+
+@router.get("/", response_model=List[schemas.NotificationOut], dependencies=[Depends(check_etag)])
+def list_notifications(
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    before_id: Optional[int] = Query(None, description="Return notifications older than this id"),
+    limit: int = Query(50, ge=1, le=200),
+    unread_only: bool = False,
+    db: Session = Depends(get_db),
+):
+    return crud.get_notifications(db, current_user.id, limit, before_id, unread_only)
+
+
+@router.get("/unread-count")
+def unread_count(
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    version = data_versions.get(current_user.id)
+    with _unread_lock:
+        cached = _unread_counts.get(current_user.id)
+        if cached is not None and cached[0] == version:
+            _unread_counts.move_to_end(current_user.id)
+            CACHE_REQUESTS.inc(cache="unread_count", result="hit")
+            return {"unread": cached[1]}
+    CACHE_REQUESTS.inc(cache="unread_count", result="miss")
+    count = crud.count_unread_notifications(db, current_user.id)
+    with _unread_lock:
+        _unread_counts[current_user.id] = (version, count)
+        _unread_counts.move_to_end(current_user.id)
+        while len(_unread_counts) > settings.UNREAD_COUNT_CACHE_SIZE:
+            _unread_counts.popitem(last=False)
+    return {"unread": count}
+
+
+@router.post("/{notification_id}/read", response_model=schemas.NotificationOut)
+def mark_read(
+    notification_id: int,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    notification = crud.mark_notification_as_read(db, current_user.id, notification_id)
+    if not notification:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
+    return notification
@@ -1,22 +1,42 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import Annotated, Dict, List
+from typing import Annotated, Dict, List, Optional
 
 from app import models, schemas
 from app.database import get_db
 from app.routers.auth import get_current_user
+from app.routers.deps import check_etag
+from app.services import downsample
 from app.services.reports import ReportGenerator
 
-router = APIRouter(prefix="/reports", tags=["Reports"])
+router = APIRouter(prefix="/reports", tags=["Reports"], dependencies=[Depends(check_etag)])
+
+
+MaxPoints = Query(None, ge=10, le=10_000, description="Downsample the series to about this many points")
+DownsampleMethod = Query("lttb", pattern=f"^({'|'.join(downsample.METHODS)})$")
 
 
 @router.get("/monthly", response_model=Dict[str, Dict[str, float]])
 def get_monthly_report(
     current_user: Annotated[models.User, Depends(get_current_user)],
+    max_points: Optional[int] = MaxPoints,
+    method: str = DownsampleMethod,
+    db: Session = Depends(get_db),
+):
+    generator = ReportGenerator(db, current_user.id)
+    return generator.monthly_trend(max_points, method)
+
+
+@router.get("/timeseries", response_model=schemas.TimeSeries)
+def get_timeseries(
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    max_points: Optional[int] = MaxPoints,
+    method: str = DownsampleMethod,
     db: Session = Depends(get_db),
 ):
+    """Daily income, expenses and running balance as parallel arrays."""
     generator = ReportGenerator(db, current_user.id)
-    return generator.monthly_trend()
+    return generator.daily_series(max_points, method)
 
 
 @router.get("/category", response_model=Dict[str, float])
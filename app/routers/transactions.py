@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Response, status, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 from datetime import date
 
 from app import crud, schemas, models
 from app.database import get_db
 from app.routers.auth import get_current_user
+from app.routers.deps import sparse_fields, sparse_response
+from app.services import categorize, export, fx, statements
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
@@ -16,17 +19,149 @@ def create_transaction(
     current_user: Annotated[models.User, Depends(get_current_user)],
     db: Session = Depends(get_db),
 ):
+    _check_currency(db, transaction.currency)
     return crud.create_transaction(db, current_user.id, transaction)
 
 
+def _check_currency(db: Session, currency: Optional[str]) -> None:
+    """Reject currencies without any exchange rate, which reports could not convert."""
+    if currency is not None and not fx.is_known_currency(db, currency):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"No exchange rate is known for currency {currency}",
+        )
+
+
+def transaction_filters(
+    category: Optional[str] = Query(None, max_length=100),
+    type: Optional[str] = Query(None, pattern="^(income|expense)$"),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    search: Optional[str] = Query(None, max_length=100, description="Substring of the description"),
+) -> dict:
+    """Query parameters mirroring ``schemas.TransactionFilters``, which POST /batch validates with."""
+    return dict(category=category, type=type, start_date=start_date, end_date=end_date, search=search)
+
+
 @router.get("/", response_model=List[schemas.TransactionOut])
 def list_transactions(
+    response: Response,
     current_user: Annotated[models.User, Depends(get_current_user)],
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[List[str]] = Depends(sparse_fields(schemas.TransactionOut)),
+    filters: dict = Depends(transaction_filters),
+    order: str = Query("newest", pattern="^(newest|oldest)$"),
+    db: Session = Depends(get_db),
+):
+    """A page of transactions; ``X-Total-Count`` holds the number matching the filters."""
+    transactions = crud.get_transactions(
+        db, current_user.id, skip, limit, fields, oldest_first=order == "oldest", **filters
+    )
+    response.headers["X-Total-Count"] = str(crud.count_transactions(db, current_user.id, **filters))
+    if fields:
+        return sparse_response(transactions, response)
+    return transactions
+
+
+@router.get("/categories", response_model=List[str])
+def list_transaction_categories(
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    """Every category the user has used, for filter choices."""
+    return crud.get_transaction_categories(db, current_user.id)
+
+
+@router.get("/export")
+def export_transactions(
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    gzip: bool = Query(False),
+    filters: dict = Depends(transaction_filters),
+    db: Session = Depends(get_db),
+):
+    """Stream the transactions matching the list filters as CSV, NDJSON or Parquet without buffering the ledger."""
+    if format == "parquet" and not export.parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export requires pyarrow to be installed",
+        )
+
+    batches = crud.iter_transaction_rows(
+        db, current_user.id, export.EXPORT_COLUMNS, default_currency=current_user.currency, **filters
+    )
+    chunks = export.ENCODERS[format](batches)
+    filename = f"transactions_{date.today()}.{format}"
+    media_type = export.MEDIA_TYPES[format]
+    if gzip:
+        chunks = export.gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+IMPORT_FORMATS = {".csv": "csv", ".tsv": "csv", ".htm": "html", ".html": "html", ".txt": "text"}
+
+
+@router.post("/import", response_model=schemas.TransactionImportOut, status_code=201)
+def import_statement(
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|html|text)$"),
+    locale: str = Query("en", pattern=f"^({'|'.join(statements.LOCALES)})$"),
+    day_first: Optional[bool] = Query(None),
+    category: Optional[str] = Query(None, min_length=1, max_length=100),
+    currency: Optional[str] = Query(None, pattern="^[A-Z]{3}$"),
+    db: Session = Depends(get_db),
+):
+    """Import a bank statement (CSV, HTML or text), streaming it row by row into the ledger.
+
+    Money going out becomes expenses, money coming in income. The format is
+    taken from the file extension unless given. Without ``category``, each
+    row gets the category suggested by the user's history, or Uncategorized.
+    """
+    _check_currency(db, currency)
+    if format is None:
+        extension = "." + (file.filename or "").rsplit(".", 1)[-1].lower()
+        format = IMPORT_FORMATS.get(extension)
+        if format is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot tell the statement format from the file name; pass format=csv|html|text",
+            )
+
+    parser = statements.StatementParser(locale, day_first)
+    if format == "html":
+        rows = parser.html_rows(file.file)
+    elif format == "csv":
+        rows = parser.csv_rows(statements.open_text(file.file))
+    else:
+        rows = parser.text_rows(statements.open_text(file.file))
+    rows = statements.transaction_rows(current_user.id, rows, category, currency)
+    if category is None:
+        rows = categorize.for_user(db, current_user.id).fill(rows)
+    imported = crud.import_transactions(db, current_user.id, rows)
+    return {"imported": imported, "format": format}
+
+
+@router.post("/categorize", response_model=List[schemas.CategorySuggestion])
+def suggest_categories(
+    request: schemas.CategorySuggestRequest,
+    current_user: Annotated[models.User, Depends(get_current_user)],
     db: Session = Depends(get_db),
 ):
-    return crud.get_transactions(db, current_user.id, skip, limit)
+    """Suggest a category for each description from the user's own history."""
+    suggestions = categorize.for_user(db, current_user.id).suggest(request.descriptions)
+    return [
+        {"description": description, **suggestion._asdict()}
+        for description, suggestion in zip(request.descriptions, suggestions)
+    ]
 
 
 @router.get("/{transaction_id}", response_model=schemas.TransactionOut)
@@ -48,6 +183,7 @@ def update_transaction(
     current_user: Annotated[models.User, Depends(get_current_user)],
     db: Session = Depends(get_db),
 ):
+    _check_currency(db, transaction_update.currency)
     transaction = crud.update_transaction(db, current_user.id, transaction_id, transaction_update)
     if not transaction:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Any, Optional, List
 from datetime import datetime, date
 
 class UserBase(BaseModel):
@@ -36,6 +36,7 @@ class TransactionBase(BaseModel):
     category: str = Field(..., min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
     method: str = Field(default="cash", max_length=100)
+    currency: Optional[str] = Field(None, pattern="^[A-Z]{3}$")
     date: date
 
 
@@ -51,6 +52,7 @@ class TransactionUpdate(BaseModel):
     category: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
     method: Optional[str] = Field(None, max_length=100)
+    currency: Optional[str] = Field(None, pattern="^[A-Z]{3}$")
     date: Optional[date] = None
 
 
@@ -63,6 +65,35 @@ class TransactionOut(TransactionBase):
     class Config:
         from_attributes = True
 
+class TransactionFilters(BaseModel):
+    """The list filters of ``GET /transactions/``, for callers outside the query string."""
+
+    category: Optional[str] = Field(None, max_length=100)
+    type: Optional[str] = Field(None, pattern="^(income|expense)$")
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    search: Optional[str] = Field(None, max_length=100)
+
+
+class CategorySuggestRequest(BaseModel):
+
+    descriptions: List[str] = Field(..., min_length=1, max_length=5000)
+
+
+class CategorySuggestion(BaseModel):
+
+    description: str
+    category: Optional[str]
+    confidence: float
+    source: Optional[str]
+
+
+class TransactionImportOut(BaseModel):
+
+    imported: int
+    format: str
+
+
 class BudgetBase(BaseModel):
 
     category: str = Field(..., min_length=1, max_length=100)
@@ -104,12 +135,15 @@ class GoalCreate(GoalBase):
 
 
 class GoalUpdate(BaseModel):
+    """Progress (``current_amount``) only moves through contributions."""
 
     name: Optional[str] = Field(None, max_length=255)
     target_amount: Optional[float] = Field(None, gt=0)
-    current_amount: Optional[float] = Field(None, ge=0)
     deadline: Optional[date] = None
 
+    class Config:
+        extra = "forbid"
+
 
 class GoalOut(GoalBase):
 
@@ -122,6 +156,25 @@ class GoalOut(GoalBase):
         from_attributes = True
 
 
+class GoalContributionCreate(BaseModel):
+
+    amount: float = Field(..., gt=0)
+    contributed_on: date = Field(default_factory=date.today)
+    transaction_id: Optional[int] = None
+    note: Optional[str] = Field(None, max_length=255)
+
+
+class GoalContributionOut(GoalContributionCreate):
+
+    id: int
+    goal_id: int
+    user_id: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class NotificationBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
     message: str = Field(..., min_length=1, max_length=1000)
@@ -178,9 +231,43 @@ class MonthlyTrend(BaseModel):
     net: float
 
 
+class TimeSeries(BaseModel):
+
+    dates: List[date]
+    income: List[float]
+    expenses: List[float]
+    balance: List[float]
+    total_points: int
+
+
 class ReportData(BaseModel):
 
     monthly_trends: List[MonthlyTrend]
     category_breakdown: List[CategoryBreakdown]
     total_income: float
     total_expenses: float
+
+
+class BatchOperation(BaseModel):
+
+    id: Optional[str] = Field(None, max_length=100)
+    method: str = Field(default="GET", pattern="^GET$")
+    path: str = Field(..., min_length=1, max_length=500)
+
+
+class BatchRequest(BaseModel):
+
+    requests: List[BatchOperation] = Field(..., min_length=1, max_length=25)
+
+
+class BatchResult(BaseModel):
+
+    id: Optional[str] = None
+    path: str
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+
+    responses: List[BatchResult]
@@ -0,0 +1,190 @@
+"""Budget threshold alerts driven by running spend totals.
+
+Every transaction write passes its expense changes here inside the write's own
+transaction. Only budgets in the affected categories are looked at, and their
+spend comes from ``budget_spend``, a running total per user, category, budget
+period and period start. A total is initialized from one SUM over its period
+the first time it is needed and then moved by each write's delta, so no write
+re-reads the ledger. Amounts are in the user's currency, converted at the
+same rates as reports. Crossing 80% or 100% of a budget in its current period
+adds a notification, all of them in one batch with the write.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.events import BUDGET_THRESHOLDS
+
+# (category, date, change in expense total in the user's currency)
+SpendChange = Tuple[str, date, float]
+# (category, date, change in expense total, currency or None for the user's)
+Expense = Tuple[str, date, float, Optional[str]]
+
+
+def period_bounds(period: str, day: date) -> Tuple[date, date]:
+    """First day of the budget period containing ``day`` and the first day after it."""
+    if period == "weekly":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    if period == "yearly":
+        return date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    start = day.replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def convert_changes(db: Session, user_id: str, expenses: Iterable[Expense]) -> List[SpendChange]:
+    """Expense changes in the user's currency, at the rates reports use.
+
+    Amounts that reports cannot convert are left out here too.
+    """
+    from app.services.reports import ReportGenerator
+
+    generator = None
+    changes = []
+    for category, day, amount, currency in expenses:
+        if currency is not None:
+            generator = generator or ReportGenerator(db, user_id)
+            amount = generator.convert(amount, currency, day)
+            if amount is None:
+                continue
+        changes.append((category, day, amount))
+    return changes
+
+
+def spend_changes(
+    db: Session, user_id: str, before: Optional[dict], after: Optional[models.Transaction]
+) -> List[SpendChange]:
+    """Expense changes between two states of a transaction (``before`` as a delta dict)."""
+    expenses = []
+    if before and before["type"] == "expense":
+        expenses.append((before["category"], date.fromisoformat(before["date"]), -before["amount"], before["currency"]))
+    if after is not None and after.type == "expense":
+        expenses.append((after.category, after.date, after.amount, after.currency))
+    return convert_changes(db, user_id, expenses)
+
+
+def _period_spend(db: Session, user_id: str, category: str, start: date, end: date) -> float:
+    from app.services.reports import ReportGenerator
+
+    return ReportGenerator(db, user_id).category_spend(category, start, end)
+
+
+def _apply_delta(db: Session, user_id: str, category: str, period: str, start: date, end: date, delta: float) -> float:
+    """Move the running total by ``delta`` and return the new total."""
+    table = models.BudgetSpend
+    spent = db.execute(
+        update(table)
+        .where(
+            table.user_id == user_id,
+            table.category == category,
+            table.period == period,
+            table.period_start == start,
+        )
+        .values(spent=table.spent + delta)
+        .returning(table.spent)
+    ).scalar()
+    if spent is None:
+        # The ledger is already flushed, so the SUM includes this change.
+        spent = _period_spend(db, user_id, category, start, end)
+        db.add(models.BudgetSpend(user_id=user_id, category=category, period=period, period_start=start, spent=spent))
+    return spent
+
+
+def current_spend(db: Session, user_id: str, category: str, period: str, start: date, end: date) -> float:
+    """The running total of a budget period; periods without one yet fall back to a SUM."""
+    table = models.BudgetSpend
+    spent = (
+        db.query(table.spent)
+        .filter(
+            table.user_id == user_id,
+            table.category == category,
+            table.period == period,
+            table.period_start == start,
+        )
+        .scalar()
+    )
+    return spent if spent is not None else _period_spend(db, user_id, category, start, end)
+
+
+def forget_spend(db: Session, user_id: str, category: str, period: Optional[str]) -> None:
+    """Drop running totals for a budget's category and period.
+
+    Totals only move while a matching budget exists, so any budget change
+    makes them suspect; the next write re-initializes them from the ledger.
+    """
+    table = models.BudgetSpend
+    db.execute(
+        delete(table).where(
+            table.user_id == user_id, table.category == category, table.period == (period or "monthly")
+        )
+    )
+
+
+def _notification(budget: models.Budget, spent: float, threshold: float) -> models.Notification:
+    if threshold >= 100:
+        title = f"Budget exceeded: {budget.category}"
+        lead = "You have gone over"
+    else:
+        title = f"Budget alert: {budget.category}"
+        lead = f"You have used {threshold:.0f}% of"
+    return models.Notification(
+        user_id=budget.user_id,
+        title=title,
+        message=(
+            f"{lead} your {budget.period} {budget.category} budget "
+            f"({spent:,.2f} spent of {budget.limit_amount:,.2f})."
+        ),
+    )
+
+
+def record_spend(
+    db: Session, user_id: str, changes: Iterable[SpendChange], today: Optional[date] = None
+) -> List[models.Notification]:
+    """Update running totals for ``changes`` and queue notifications for crossed thresholds.
+
+    Call after the changed transactions are flushed and before commit.
+    """
+    by_category: Dict[str, List[Tuple[date, float]]] = defaultdict(list)
+    for category, day, delta in changes:
+        if delta:
+            by_category[category].append((day, delta))
+    if not by_category:
+        return []
+
+    budgets = (
+        db.query(models.Budget)
+        .filter(models.Budget.user_id == user_id, models.Budget.category.in_(list(by_category)))
+        .all()
+    )
+    today = today or date.today()
+    period_budgets: Dict[Tuple[str, str], List[models.Budget]] = defaultdict(list)
+    for budget in budgets:
+        period_budgets[(budget.category, budget.period or "monthly")].append(budget)
+
+    notifications = []
+    for (category, period), matching in period_budgets.items():
+        deltas: Dict[Tuple[date, date], float] = defaultdict(float)
+        for day, delta in by_category[category]:
+            deltas[period_bounds(period, day)] += delta
+        current = period_bounds(period, today)
+        for (start, end), delta in deltas.items():
+            if not delta:
+                continue
+            spent = _apply_delta(db, user_id, category, period, start, end, delta)
+            if (start, end) != current:
+                continue
+            for budget in matching:
+                if budget.limit_amount <= 0:
+                    continue
+                before = (spent - delta) / budget.limit_amount * 100
+                after = spent / budget.limit_amount * 100
+                crossed = [t for t in BUDGET_THRESHOLDS if before < t <= after]
+                if crossed:
+                    notifications.append(_notification(budget, spent, crossed[-1]))
+    db.add_all(notifications)
+    return notifications
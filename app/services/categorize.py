@@ -0,0 +1,215 @@
+"""Category suggestions learned from a user's own (description -> category) history.
+
+Descriptions are reduced to word tokens (digits such as store numbers and
+references are dropped, as are card-network boilerplate words). Three
+lookups run in order, cheapest first:
+
+1. exact: the same token sequence seen before;
+2. keyword: the deepest match in a trie of leading tokens, so
+   "STARBUCKS STORE 0412" matches history for "Starbucks";
+3. model: a multinomial naive Bayes classifier over all tokens, scored for a
+   whole batch in a few numpy operations (optional; needs numpy).
+
+The exact and keyword indexes are compiled to (category, confidence) when
+built, so a lookup is a handful of dict accesses. A built categorizer is cached per
+user and data version.
+"""
+
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from app import crud
+from app.config import settings
+from app.services.metrics import CACHE_REQUESTS
+from app.services.versioning import data_versions
+
+DEFAULT_CATEGORY = "Uncategorized"
+# Words that appear in card and bank descriptions regardless of the merchant.
+STOPWORDS = frozenset(
+    "ach bank card com debit direct from inc ltd online payment pos purchase recurring ref the to "
+    "transaction transfer via visa mastercard www".split()
+)
+MAX_TOKENS = 8
+MIN_CONFIDENCE = 0.5
+
+_WORD = re.compile(r"[a-z][a-z&']+")
+
+
+class Suggestion(NamedTuple):
+
+    category: Optional[str]
+    confidence: float
+    source: Optional[str]  # "exact", "keyword", "model" or None
+
+
+NO_SUGGESTION = Suggestion(None, 0.0, None)
+
+
+def tokens(description: Optional[str]) -> Tuple[str, ...]:
+    words = _WORD.findall((description or "").lower())
+    return tuple(word for word in words if word not in STOPWORDS)[:MAX_TOKENS]
+
+
+def _best(counts: Counter) -> Tuple[str, float, int]:
+    category, count = counts.most_common(1)[0]
+    total = sum(counts.values())
+    return category, count / total, total
+
+
+class _NaiveBayes:
+
+    def __init__(self, examples: List[Tuple[Tuple[str, ...], str, int]]):
+        import numpy as np
+
+        self._np = np
+        self.categories = sorted({category for _, category, _ in examples})
+        category_ids = {category: index for index, category in enumerate(self.categories)}
+        self.vocabulary: Dict[str, int] = {}
+        rows, columns, weights = [], [], []
+        priors = np.zeros(len(self.categories))
+        for words, category, count in examples:
+            priors[category_ids[category]] += count
+            for word in words:
+                rows.append(category_ids[category])
+                columns.append(self.vocabulary.setdefault(word, len(self.vocabulary)))
+                weights.append(count)
+        counts = np.zeros((len(self.categories), len(self.vocabulary)))
+        np.add.at(counts, (rows, columns), weights)
+        # Laplace smoothing; stored token-major so a batch gathers rows.
+        self.log_likelihood = np.log(
+            (counts + 1.0) / (counts.sum(axis=1, keepdims=True) + len(self.vocabulary))
+        ).T.copy()
+        self.log_prior = np.log(priors / priors.sum())
+
+    def predict(self, documents: Sequence[Tuple[str, ...]]) -> List[Suggestion]:
+        np = self._np
+        ids, owners = [], []
+        for index, words in enumerate(documents):
+            for word in words:
+                column = self.vocabulary.get(word)
+                if column is not None:
+                    ids.append(column)
+                    owners.append(index)
+        if not ids:
+            return [NO_SUGGESTION] * len(documents)
+        scores = np.tile(self.log_prior, (len(documents), 1))
+        np.add.at(scores, owners, self.log_likelihood[ids])
+        scores -= scores.max(axis=1, keepdims=True)
+        posterior = np.exp(scores)
+        posterior /= posterior.sum(axis=1, keepdims=True)
+        best = posterior.argmax(axis=1)
+        known = np.zeros(len(documents), dtype=bool)
+        known[owners] = True
+        return [
+            Suggestion(self.categories[best[index]], float(posterior[index, best[index]]), "model")
+            if known[index] else NO_SUGGESTION
+            for index in range(len(documents))
+        ]
+
+
+class Categorizer:
+
+    def __init__(self, history: Iterable[Tuple[str, str, int]], naive_bayes: bool = True):
+        """``history`` holds (description, category, number of transactions)."""
+        exact: Dict[Tuple[str, ...], Counter] = {}
+        trie: dict = {}
+        examples = []
+        for description, category, count in history:
+            words = tokens(description)
+            if not words or not category or category == DEFAULT_CATEGORY:
+                continue
+            examples.append((words, category, count))
+            exact.setdefault(words, Counter())[category] += count
+            node = trie
+            for word in words:
+                # node: word -> [children, category counts]
+                child = node.setdefault(word, [{}, Counter()])
+                child[1][category] += count
+                node = child[0]
+
+        self._exact = {words: _best(counts)[:2] for words, counts in exact.items()}
+        self._trie = self._compile(trie)
+        self._model = None
+        if naive_bayes and len({category for _, category, _ in examples}) > 1:
+            try:
+                self._model = _NaiveBayes(examples)
+            except ImportError:
+                pass
+
+    @classmethod
+    def _compile(cls, node: dict) -> dict:
+        """Replace each node's counts by its (category, confidence, support)."""
+        return {word: (cls._compile(children), _best(counts)) for word, (children, counts) in node.items()}
+
+    def _keyword(self, words: Tuple[str, ...]) -> Suggestion:
+        node, found = self._trie, None
+        for word in words:
+            entry = node.get(word)
+            if entry is None:
+                break
+            node, found = entry[0], entry[1]
+        if found is None or found[1] < MIN_CONFIDENCE:
+            return NO_SUGGESTION
+        return Suggestion(found[0], found[1], "keyword")
+
+    def suggest(self, descriptions: Sequence[Optional[str]]) -> List[Suggestion]:
+        documents = [tokens(description) for description in descriptions]
+        suggestions: List[Suggestion] = []
+        undecided = []
+        for index, words in enumerate(documents):
+            match = self._exact.get(words)
+            if match is not None and match[1] >= MIN_CONFIDENCE:
+                suggestions.append(Suggestion(match[0], match[1], "exact"))
+                continue
+            suggestion = self._keyword(words) if words else NO_SUGGESTION
+            suggestions.append(suggestion)
+            if suggestion.category is None and words:
+                undecided.append(index)
+        if self._model is not None and undecided:
+            for index, suggestion in zip(undecided, self._model.predict([documents[i] for i in undecided])):
+                if suggestion.confidence >= MIN_CONFIDENCE:
+                    suggestions[index] = suggestion
+        return suggestions
+
+    def fill(self, rows: Iterable[dict], batch_size: int = 1000, default: str = DEFAULT_CATEGORY) -> Iterator[dict]:
+        """Set ``category`` on transaction rows that have none, one batch of suggestions at a time."""
+        batch: List[dict] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield from self._fill_batch(batch, default)
+                batch = []
+        yield from self._fill_batch(batch, default)
+
+    def _fill_batch(self, batch: List[dict], default: str) -> List[dict]:
+        pending = [row for row in batch if not row.get("category")]
+        for row, suggestion in zip(pending, self.suggest([row.get("description") for row in pending])):
+            row["category"] = suggestion.category or default
+        return batch
+
+
+# user id -> (data version, categorizer), least recently used first.
+_categorizers: "OrderedDict[str, Tuple[int, Categorizer]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def for_user(db, user_id: str) -> Categorizer:
+    """The user's categorizer, rebuilt from their history when their data has changed."""
+    version = data_versions.get(user_id)
+    with _lock:
+        cached = _categorizers.get(user_id)
+        if cached is not None and cached[0] == version:
+            _categorizers.move_to_end(user_id)
+            CACHE_REQUESTS.inc(cache="categorizer", result="hit")
+            return cached[1]
+    CACHE_REQUESTS.inc(cache="categorizer", result="miss")
+    history = crud.get_category_history(db, user_id, settings.CATEGORIZER_HISTORY_ROWS)
+    categorizer = Categorizer(history, naive_bayes=settings.CATEGORIZER_NAIVE_BAYES)
+    with _lock:
+        _categorizers[user_id] = (version, categorizer)
+        _categorizers.move_to_end(user_id)
+        while len(_categorizers) > settings.CATEGORIZER_CACHE_SIZE:
+            _categorizers.popitem(last=False)
+    return categorizer
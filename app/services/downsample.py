@@ -0,0 +1,70 @@
+"""Downsampling of chart series to a point budget.
+
+``lttb`` (Largest-Triangle-Three-Buckets) keeps the points that carry a
+line's visual shape; ``min_max`` keeps each bucket's extremes, so spikes
+survive. Both return indices into the input, so several series sharing one x
+axis can be reduced together with ``select``.
+"""
+
+from typing import List, Sequence
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    import numpy as np
+
+    n = len(y)
+    if threshold >= n or n <= 2:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1]
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        # The third corner is the average of the next bucket (the last point for the last bucket).
+        if end < next_end:
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(areas.argmax())
+        selected.append(a)
+    selected.append(n - 1)
+    return selected
+
+
+def min_max(y: Sequence[float], threshold: int) -> List[int]:
+    import numpy as np
+
+    n = len(y)
+    if threshold >= n or n <= 2:
+        return list(range(n))
+    y = np.asarray(y, dtype=float)
+    buckets = max(1, (threshold - 2) // 2)
+    edges = np.linspace(1, n - 1, buckets + 1).astype(int)
+    selected = {0, n - 1}
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            bucket = y[start:end]
+            selected.add(start + int(bucket.argmin()))
+            selected.add(start + int(bucket.argmax()))
+    return sorted(selected)
+
+
+def select(x: Sequence[float], series: Sequence[Sequence[float]], max_points: int, method: str = "lttb") -> List[int]:
+    """Indices to keep so that every one of ``series`` keeps its shape within ``max_points`` in total."""
+    n = len(x)
+    if n <= max_points:
+        return list(range(n))
+    budget = max(3, max_points // max(1, len(series)))
+    keep = set()
+    for y in series:
+        keep.update(lttb(x, y, budget) if method == "lttb" else min_max(y, budget))
+    return sorted(keep)
@@ -0,0 +1,160 @@
+"""In-process event bus that pushes data deltas to connected clients.
+
+crud writes publish small deltas (a new transaction, a budget's new spend, a
+goal's new progress) to the user's subscribers. Nothing is computed for users
+without a live connection.
+"""
+
+import asyncio
+import threading
+from datetime import date
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.versioning import data_versions
+
+BUDGET_THRESHOLDS = (80.0, 100.0)
+
+
+class Subscription:
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, max_queued: int = 100):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+
+    def _put(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            # A client that stopped reading gets one resync marker instead of
+            # an unbounded backlog; it should refetch its reports.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {"event": "resync", "data": {"version": data_versions.get(self.user_id)}}
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+
+class EventBus:
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return bool(self._subscribers.get(user_id))
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.user_id, None)
+
+    def publish(self, user_id: str, event: str, data: Dict[str, Any]) -> None:
+        """Queue an event for every subscriber of ``user_id``; safe from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        message = {"event": event, "data": {**data, "version": data_versions.get(user_id)}}
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(subscription._put, message)
+
+
+bus = EventBus()
+
+
+def transaction_delta(transaction: models.Transaction) -> Dict[str, Any]:
+    return {
+        "id": transaction.id,
+        "amount": transaction.amount,
+        "type": transaction.type,
+        "category": transaction.category,
+        "currency": transaction.currency,
+        "date": transaction.date.isoformat(),
+    }
+
+
+def _publish_budget_progress(db: Session, user_id: str, category: str, changes: List[Tuple[date, float]]) -> None:
+    """Publish progress of the category's budgets whose current period ``changes`` moved.
+
+    Spend comes from the running ``budget_spend`` totals the write just
+    updated, so publishing does not re-read the ledger.
+    """
+    from app.services import alerts
+
+    budgets = (
+        db.query(models.Budget)
+        .filter(models.Budget.user_id == user_id, models.Budget.category == category)
+        .all()
+    )
+    today = date.today()
+    for budget in budgets:
+        period = budget.period or "monthly"
+        start, end = alerts.period_bounds(period, today)
+        delta = sum(amount for day, amount in changes if start <= day < end)
+        if not delta or budget.limit_amount <= 0:
+            continue
+        spent = alerts.current_spend(db, user_id, category, period, start, end)
+        before = (spent - delta) / budget.limit_amount * 100
+        after = spent / budget.limit_amount * 100
+        crossed = [t for t in BUDGET_THRESHOLDS if before < t <= after]
+        bus.publish(user_id, "budget.progress", {
+            "id": budget.id,
+            "category": category,
+            "period": period,
+            "limit": budget.limit_amount,
+            "spent": spent,
+            "percentage": min(100, after),
+            "threshold_crossed": crossed[-1] if crossed else None,
+        })
+
+
+def transaction_changed(
+    db: Session,
+    user_id: str,
+    event: str,
+    data: Dict[str, Any],
+    spend_changes: Iterable[Tuple[str, date, float]],
+) -> None:
+    """Publish a transaction event and the progress of budgets it affected.
+
+    ``spend_changes`` holds (category, date, change in expense total) in the
+    user's currency, as passed to ``alerts.record_spend``.
+    """
+    if not bus.has_subscribers(user_id):
+        return
+    bus.publish(user_id, event, data)
+    by_category: Dict[str, List[Tuple[date, float]]] = {}
+    for category, day, delta in spend_changes:
+        if delta:
+            by_category.setdefault(category, []).append((day, delta))
+    for category, changes in by_category.items():
+        _publish_budget_progress(db, user_id, category, changes)
+
+
+def goal_changed(user_id: str, event: str, goal: models.Goal) -> None:
+    if not bus.has_subscribers(user_id):
+        return
+    percentage = (goal.current_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
+    bus.publish(user_id, event, {
+        "id": goal.id,
+        "name": goal.name,
+        "current": goal.current_amount,
+        "target": goal.target_amount,
+        "percentage": min(100, percentage),
+        "completed": goal.completed,
+    })
+
+
+def resource_changed(user_id: str, event: str, resource_id: int) -> None:
+    if bus.has_subscribers(user_id):
+        bus.publish(user_id, event, {"id": resource_id})
@@ -0,0 +1,123 @@
+"""Streaming encoders for transaction exports.
+
+Each encoder consumes batches of rows and yields bytes, so an export never
+holds more than one batch in memory regardless of the ledger size.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Sequence
+
+EXPORT_COLUMNS = ("id", "date", "type", "category", "amount", "currency", "description", "method", "created_at")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def csv_chunks(batches: Iterable[Sequence[Sequence]], columns: Sequence[str] = EXPORT_COLUMNS) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def ndjson_chunks(batches: Iterable[Sequence[Sequence]], columns: Sequence[str] = EXPORT_COLUMNS) -> Iterator[bytes]:
+    for rows in batches:
+        lines = [json.dumps(dict(zip(columns, row)), default=_json_default) for row in rows]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_chunks(batches: Iterable[Sequence[Sequence]], columns: Sequence[str] = EXPORT_COLUMNS) -> Iterator[bytes]:
+    """Write one Parquet row group per batch. Requires ``pyarrow``."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        "id": pa.int64(),
+        "date": pa.date32(),
+        "type": pa.string(),
+        "category": pa.string(),
+        "amount": pa.float64(),
+        "currency": pa.string(),
+        "description": pa.string(),
+        "method": pa.string(),
+        "created_at": pa.timestamp("us"),
+    }
+    schema = pa.schema([(name, types[name]) for name in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in batches:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+ENCODERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+    "parquet": parquet_chunks,
+}
@@ -0,0 +1,257 @@
+"""Exchange rates from an upstream JSON API, cached in memory and on disk.
+
+Fresh rates (younger than the TTL) are served from memory. Expired rates are
+still served while one background refresh replaces them (stale-while-
+revalidate), and concurrent cold lookups for the same base share a single
+upstream request. The cache file keeps rates across restarts; if upstream has
+never answered, built-in fallback rates are used.
+"""
+
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_RATES = {
+    "USD": 1.0,
+    "EUR": 0.92,
+    "GBP": 0.79,
+    "JPY": 149.5,
+    "CAD": 1.36,
+    "AUD": 1.53,
+    "CHF": 0.88,
+    "CNY": 7.08,
+}
+
+# base currency -> (fetched at, epoch seconds; rates)
+CacheEntry = Tuple[float, Dict[str, float]]
+
+
+def fallback_rates(base: str) -> Dict[str, float]:
+    """The built-in USD rates re-expressed against ``base``."""
+    pivot = FALLBACK_RATES.get(base)
+    if pivot is None:
+        return dict(FALLBACK_RATES)
+    return {currency: rate / pivot for currency, rate in FALLBACK_RATES.items()}
+
+
+def is_known_currency(db, currency: str) -> bool:
+    """Whether amounts in ``currency`` can be converted: it has a built-in or a stored rate."""
+    from sqlalchemy import exists
+
+    from app.models import ExchangeRate
+
+    currency = currency.upper()
+    return currency in FALLBACK_RATES or db.query(exists().where(ExchangeRate.currency == currency)).scalar()
+
+
+class ExchangeRateService:
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float = 3600.0,
+        cache_path: Optional[str] = None,
+        timeout: float = 10.0,
+        pool_size: int = 4,
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._cache: Dict[str, CacheEntry] = {}
+        self._loaded = False
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._session = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = "personal-finance-tracker"
+            self._session = session
+        return self._session
+
+    def get_rates(self, base: str = "USD") -> Dict[str, float]:
+        base = base.upper()
+        self._load()
+        entry = self._cache.get(base)
+        if entry is not None:
+            fetched_at, rates = entry
+            if time.time() - fetched_at >= self.ttl:
+                self._refresh_in_background(base)
+            return rates
+        try:
+            return self._refresh(base).result()
+        except Exception as e:
+            logger.warning("Exchange rates for %s unavailable (%s); using fallback rates", base, e)
+            return fallback_rates(base)
+
+    def convert(self, amount: float, from_currency: str, to_currency: str) -> float:
+        """``amount`` in ``to_currency``; ValueError when no rate to it is known."""
+        if from_currency.upper() == to_currency.upper():
+            return amount
+        rate = self.get_rates(from_currency).get(to_currency.upper())
+        if rate is None:
+            raise ValueError(f"No exchange rate from {from_currency.upper()} to {to_currency.upper()}")
+        return amount * rate
+
+    def _refresh(self, base: str) -> Future:
+        """Start a fetch for ``base`` in this thread, or join the one already running."""
+        with self._lock:
+            future = self._inflight.get(base)
+            if future is not None:
+                leader = False
+            else:
+                future = self._inflight[base] = Future()
+                leader = True
+        if leader:
+            self._fetch_into(base, future)
+        return future
+
+    def _refresh_in_background(self, base: str) -> None:
+        with self._lock:
+            if base in self._inflight:
+                return
+            future = self._inflight[base] = Future()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fx-refresh")
+        self._executor.submit(self._fetch_into, base, future)
+
+    def _fetch_into(self, base: str, future: Future) -> None:
+        try:
+            response = self.session.get(self.url.format(base=base), timeout=self.timeout)
+            response.raise_for_status()
+            rates = {currency: float(rate) for currency, rate in response.json()["rates"].items()}
+            with self._lock:
+                self._cache[base] = (time.time(), rates)
+            self._save()
+            future.set_result(rates)
+        except Exception as e:
+            logger.warning("Exchange rate refresh for %s failed: %s", base, e)
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(base, None)
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            with self._lock:
+                for base, entry in stored.items():
+                    self._cache.setdefault(base, (entry["fetched_at"], entry["rates"]))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable exchange rate cache %s: %s", self.cache_path, e)
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+        with self._lock:
+            stored = {base: {"fetched_at": fetched_at, "rates": rates} for base, (fetched_at, rates) in self._cache.items()}
+        temporary = f"{self.cache_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            os.replace(temporary, self.cache_path)
+        except OSError as e:
+            logger.warning("Could not write exchange rate cache %s: %s", self.cache_path, e)
+
+
+exchange_rates = ExchangeRateService(
+    settings.FX_RATES_URL,
+    ttl=settings.FX_CACHE_TTL,
+    cache_path=settings.FX_CACHE_PATH,
+    timeout=settings.FX_TIMEOUT,
+)
+
+
+def load_rate_history(db, path: str, batch_size: int = 10_000) -> int:
+    """Load daily rates from a ``date,currency,rate`` CSV (units per US dollar).
+
+    Days missing between two quotes of a currency (weekends, holidays) take the
+    previous quote, so reports can join on the exact date. Existing rows are
+    overwritten, and users whose reports convert currencies get a new data
+    version so cached reports and ETags are refreshed. Returns the number of
+    rows written.
+    """
+    from sqlalchemy import select
+
+    from app.models import ExchangeRate, Transaction, User
+    from app.services.versioning import data_versions
+
+    quotes: Dict[str, Dict[date, float]] = defaultdict(dict)
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            quotes[row["currency"].strip().upper()][date.fromisoformat(row["date"].strip())] = float(row["rate"])
+
+    rows: List[dict] = []
+    for currency, by_day in quotes.items():
+        days = sorted(by_day)
+        day, rate = days[0], by_day[days[0]]
+        while day <= days[-1]:
+            rate = by_day.get(day, rate)
+            rows.append({"currency": currency, "rate_date": day, "rate": rate})
+            day += timedelta(days=1)
+
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(ExchangeRate.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=["currency", "rate_date"], set_={"rate": statement.excluded.rate}
+    )
+    for offset in range(0, len(rows), batch_size):
+        db.execute(statement, rows[offset:offset + batch_size])
+    db.commit()
+
+    # Only ledgers holding amounts in another currency than the user's are converted.
+    converted = (
+        select(Transaction.user_id)
+        .join(User, User.id == Transaction.user_id)
+        .where(Transaction.currency.isnot(None), Transaction.currency != User.currency)
+        .distinct()
+    )
+    for user_id in db.execute(converted).scalars():
+        data_versions.bump(user_id)
+    return len(rows)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.database import SessionLocal, init_db
+
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m app.services.fx RATES.csv   (columns: date,currency,rate per USD)")
+    init_db()
+    session = SessionLocal()
+    try:
+        print(f"Loaded {load_rate_history(session, sys.argv[1]):,} daily rates")
+    finally:
+        session.close()
@@ -0,0 +1,141 @@
+"""Sampling profiler for single requests, with on-disk profile storage.
+
+Sync endpoints run on threadpool workers, out of reach of a cProfile enabled
+in the event-loop thread, so requests are profiled by sampling stacks: those
+of the event-loop thread and of the workers running in a copy of the request's
+context (how anyio hands calls to its threads), so concurrent requests on
+other workers stay out of the profile. Only stacks that pass through
+application code are kept.
+Profiles are stored as folded stacks (one ``frame;frame;frame count`` line per
+stack), readable directly or with flamegraph.pl/speedscope.
+"""
+
+import contextvars
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+APP_PACKAGE = "app."
+_OWN_MODULES = (__name__, "app.middleware.profiler")
+
+# The sampler profiling the current request, set by the profiler middleware.
+active_sampler: contextvars.ContextVar[Optional["StackSampler"]] = contextvars.ContextVar(
+    "active_sampler", default=None
+)
+
+
+class StackSampler:
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started = 0.0
+        self.duration = 0.0
+        self._loop_ident: Optional[int] = None
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._loop_ident = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self.samples
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident or (ident != self._loop_ident and not self._serves_request(frame)):
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    module = frame.f_globals.get("__name__", "?")
+                    if module.startswith(APP_PACKAGE) and module not in _OWN_MODULES:
+                        in_app = True
+                    stack.append(f"{module}.{frame.f_code.co_name}")
+                    frame = frame.f_back
+                if in_app:
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def _serves_request(self, frame) -> bool:
+        """Whether a worker thread is running a call made in this sampler's request."""
+        while frame is not None:
+            if "context" in frame.f_code.co_varnames:
+                context = frame.f_locals.get("context")
+                if isinstance(context, contextvars.Context) and context.get(active_sampler) is self:
+                    return True
+            frame = frame.f_back
+        return False
+
+
+def render(samples: Counter, title: str, duration: float, interval: float) -> str:
+    self_counts: Counter = Counter()
+    for stack, count in samples.items():
+        self_counts[stack.rsplit(";", 1)[-1]] += count
+    total = sum(samples.values()) or 1
+    lines = [
+        f"# {title}",
+        f"# duration: {duration * 1000:.1f} ms, samples: {sum(samples.values())}, interval: {interval * 1000:.1f} ms",
+        "# top functions by own samples:",
+    ]
+    for function, count in self_counts.most_common(20):
+        lines.append(f"#   {count / total * 100:5.1f}%  {function}")
+    lines.extend(f"{stack} {count}" for stack, count in samples.most_common())
+    return "\n".join(lines) + "\n"
+
+
+class ProfileStore:
+
+    def __init__(self, directory: str, max_profiles: int = 200):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def save(self, content: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}"
+        with open(os.path.join(self.directory, f"{profile_id}.folded"), "w", encoding="utf-8") as f:
+            f.write(content)
+        self._prune()
+        return profile_id
+
+    def _prune(self) -> None:
+        profiles = self.list()
+        for profile in profiles[self.max_profiles:]:
+            os.remove(os.path.join(self.directory, f"{profile['id']}.folded"))
+
+    def list(self) -> List[Dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".folded"):
+                path = os.path.join(self.directory, name)
+                with open(path, encoding="utf-8") as f:
+                    title = f.readline().lstrip("# ").strip()
+                profiles.append({"id": name[: -len(".folded")], "request": title, "size": os.path.getsize(path)})
+        return sorted(profiles, key=lambda profile: profile["id"], reverse=True)
+
+    def load(self, profile_id: str) -> Optional[str]:
+        if os.path.basename(profile_id) != profile_id:
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.folded")
+        if not os.path.isfile(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+
+store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_STORED)
@@ -0,0 +1,105 @@
+"""Per-request SQL statistics collected from SQLAlchemy cursor events.
+
+A request activates a ``QueryStats`` through a context variable; the cursor
+event handlers add every statement's duration to it, log slow statements with
+their query plan and, at the end, flag statements repeated often enough to be
+an N+1 pattern.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.services.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request.",
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_TIME_PER_REQUEST = REGISTRY.histogram("db_time_per_request_seconds", "Time spent in SQL per HTTP request.")
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> Dict[str, int]:
+        """SELECTs run at least ``threshold`` times: likely one query per row of another."""
+        return {
+            statement: count
+            for statement, count in self.statements.items()
+            if count >= threshold and statement.lstrip().upper().startswith("SELECT")
+        }
+
+
+def start_request() -> QueryStats:
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def _explain(conn, cursor, statement: str, parameters) -> List[str]:
+    dialect_prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    # A separate raw DBAPI cursor keeps the plan query out of these events.
+    plan_cursor = cursor.connection.cursor()
+    try:
+        plan_cursor.execute(dialect_prefix + statement, parameters)
+        return [" ".join(str(column) for column in row) for row in plan_cursor.fetchall()]
+    finally:
+        plan_cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"]
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS and not executemany:
+        try:
+            plan = _explain(conn, cursor, statement, parameters)
+        except Exception as e:
+            plan = [f"EXPLAIN failed: {e}"]
+        logger.warning(
+            "Slow query (%.1f ms): %s\nParameters: %r\nPlan:\n  %s",
+            elapsed * 1000, statement, parameters, "\n  ".join(plan),
+        )
+
+
+def finish_request(stats: QueryStats, path: str) -> Dict[str, int]:
+    """Record the request's totals and return statements suspected of N+1."""
+    DB_QUERIES_PER_REQUEST.observe(stats.count)
+    DB_TIME_PER_REQUEST.observe(stats.total_time)
+    suspects = stats.repeated_statements(settings.N_PLUS_ONE_THRESHOLD)
+    for statement, count in suspects.items():
+        logger.warning("Possible N+1 on %s: statement ran %d times: %s", path, count, statement)
+    return suspects
+
+
+def install(target=Engine) -> None:
+    """Listen on every engine (or just ``target``); safe to call more than once."""
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
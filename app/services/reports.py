@@ -1,61 +1,199 @@
-from sqlalchemy.orm import Session
-from typing import List, Dict
-from datetime import datetime, timedelta
-from collections import defaultdict
+from sqlalchemy import Integer, and_, case, cast, exists, func, literal
+from sqlalchemy.orm import Session, aliased
+from typing import Dict, Optional
+from datetime import date
+from itertools import accumulate
 
-from app import models, crud
+from app import models, crud, schemas
+from app.services import downsample
+from app.services.fx import FALLBACK_RATES
+
+
+def _fallback_rate(currency):
+    """The built-in rate of ``currency``, or NULL so that unconvertible amounts stay out of totals."""
+    return case(*((currency == code, rate) for code, rate in FALLBACK_RATES.items()), else_=None)
 
 
 class ReportGenerator:
+    """Reports over one user's ledger, aggregated in SQL in the user's currency.
+
+    Amounts in other currencies are converted in the same query by joining
+    ``exchange_rates`` on (currency, date); no row is converted in Python.
+    """
 
     def __init__(self, db: Session, user_id: str):
         self.db = db
         self.user_id = user_id
+        self._currency = None
+        self._needs_conversion = None
+        self._rates: Dict[tuple, Optional[float]] = {}
+
+    @property
+    def currency(self) -> str:
+        if self._currency is None:
+            user = self.db.get(models.User, self.user_id)
+            self._currency = (user.currency if user else None) or "USD"
+        return self._currency
+
+    def _ledger(self, *columns):
+        """Query ``columns`` over the user's transactions, where ``amount`` may use ``self.amount``."""
+        query = self.db.query(*columns).select_from(models.Transaction).filter(models.Transaction.user_id == self.user_id)
+        if self.needs_conversion:
+            tx = models.Transaction
+            query = query.outerjoin(
+                self._from_rate, and_(self._from_rate.currency == tx.currency, self._from_rate.rate_date == tx.date)
+            ).outerjoin(
+                self._to_rate, and_(self._to_rate.currency == self.currency, self._to_rate.rate_date == tx.date)
+            )
+        return query
+
+    @property
+    def needs_conversion(self) -> bool:
+        if self._needs_conversion is None:
+            tx = models.Transaction
+            self._needs_conversion = self.db.query(
+                exists().where(tx.user_id == self.user_id, tx.currency.isnot(None), tx.currency != self.currency)
+            ).scalar()
+            if self._needs_conversion:
+                self._from_rate = aliased(models.ExchangeRate)
+                self._to_rate = aliased(models.ExchangeRate)
+        return self._needs_conversion
+
+    @property
+    def amount(self):
+        """The transaction amount in the reporting currency, as a SQL expression."""
+        tx = models.Transaction
+        if not self.needs_conversion:
+            return tx.amount
+        currency = func.coalesce(tx.currency, self.currency)
+        # Rates are units per USD; days without a stored rate use the built-in table.
+        from_rate = func.coalesce(self._from_rate.rate, _fallback_rate(currency))
+        to_rate = func.coalesce(self._to_rate.rate, _fallback_rate(literal(self.currency)))
+        return case((currency == self.currency, tx.amount), else_=tx.amount * to_rate / from_rate)
+
+    def _rate(self, currency: str, day: date) -> Optional[float]:
+        key = (currency, day)
+        if key not in self._rates:
+            stored = (
+                self.db.query(models.ExchangeRate.rate)
+                .filter(models.ExchangeRate.currency == currency, models.ExchangeRate.rate_date == day)
+                .scalar()
+            )
+            self._rates[key] = stored if stored is not None else FALLBACK_RATES.get(currency)
+        return self._rates[key]
+
+    def convert(self, amount: float, currency: Optional[str], day: date) -> Optional[float]:
+        """``amount`` in the reporting currency, converted as ``amount`` converts it in SQL.
+
+        None when either currency has no rate, as such amounts are left out of totals.
+        """
+        if currency is None or currency == self.currency:
+            return amount
+        from_rate, to_rate = self._rate(currency, day), self._rate(self.currency, day)
+        if from_rate is None or to_rate is None:
+            return None
+        return amount * to_rate / from_rate
+
+    def category_spend(self, category: str, start: Optional[date] = None, end: Optional[date] = None) -> float:
+        """Expenses in ``category`` on days in [start, end), in the reporting currency."""
+        tx = models.Transaction
+        query = self._ledger(func.coalesce(func.sum(self.amount), 0.0)).filter(
+            tx.category == category, tx.type == "expense"
+        )
+        if start is not None:
+            query = query.filter(tx.date >= start)
+        if end is not None:
+            query = query.filter(tx.date < end)
+        return query.scalar()
+
+    def _totals(self):
+        tx = models.Transaction
+        return self._ledger(
+            func.coalesce(func.sum(case((tx.type == "income", self.amount), else_=0.0)), 0.0).label("income"),
+            func.coalesce(func.sum(case((tx.type == "expense", self.amount), else_=0.0)), 0.0).label("expenses"),
+            func.count(tx.id).label("count"),
+        ).one()
 
-    def get_transactions(self) -> List:
-        return crud.get_transactions(self.db, self.user_id, skip=0, limit=10000)
+    def _expenses_by_category(self) -> Dict[str, float]:
+        tx = models.Transaction
+        rows = self._ledger(tx.category, func.sum(self.amount)).filter(tx.type == "expense").group_by(tx.category)
+        return {category: spent for category, spent in rows}
+
+    def dashboard_summary(self) -> schemas.DashboardSummary:
+        totals = self._totals()
+        return schemas.DashboardSummary(
+            total_income=totals.income,
+            total_expenses=totals.expenses,
+            net_balance=totals.income - totals.expenses,
+            transaction_count=totals.count,
+            budget_count=self.db.query(func.count(models.Budget.id)).filter(models.Budget.user_id == self.user_id).scalar(),
+            goal_count=self.db.query(func.count(models.Goal.id)).filter(models.Goal.user_id == self.user_id).scalar(),
+        )
 
     def category_summary(self) -> Dict[str, float]:
-        transactions = self.get_transactions()
-        summary = defaultdict(float)
-        
-        for tx in transactions:
-            if tx.type == "expense":
-                summary[tx.category] += tx.amount
-        
-        return dict(summary)
-
-    def monthly_trend(self) -> Dict[str, Dict[str, float]]:
-        transactions = self.get_transactions()
-        trend = defaultdict(lambda: {"income": 0.0, "expenses": 0.0})
-        
-        for tx in transactions:
-            month_key = tx.date.strftime("%Y-%m")
-            if tx.type == "income":
-                trend[month_key]["income"] += tx.amount
-            else:
-                trend[month_key]["expenses"] += tx.amount
-        
-        return dict(trend)
+        return self._expenses_by_category()
+
+    def monthly_trend(self, max_points: Optional[int] = None, method: str = "lttb") -> Dict[str, Dict[str, float]]:
+        tx = models.Transaction
+        if self.db.get_bind().dialect.name == "sqlite":
+            month = func.strftime("%Y-%m", tx.date)
+        else:
+            month = func.to_char(tx.date, "YYYY-MM")
+        rows = self._ledger(
+            month.label("month"),
+            func.sum(case((tx.type == "income", self.amount), else_=0.0)),
+            func.sum(case((tx.type == "income", 0.0), else_=self.amount)),
+        ).group_by(month).order_by(month.desc()).all()
+        if max_points and len(rows) > max_points:
+            rows.reverse()
+            x = [int(key[:4]) * 12 + int(key[5:7]) for key, _, _ in rows]
+            keep = downsample.select(x, [[row[1] for row in rows], [row[2] for row in rows]], max_points, method)
+            rows = [rows[index] for index in reversed(keep)]
+        return {key: {"income": income, "expenses": expenses} for key, income, expenses in rows}
+
+    def daily_series(self, max_points: Optional[int] = None, method: str = "lttb") -> Dict[str, list]:
+        """Income, expenses and running balance per day with activity, oldest first.
+
+        The balance is accumulated over every day before downsampling, so the
+        kept points show the true balance.
+        """
+        tx = models.Transaction
+        rows = self._ledger(
+            tx.date,
+            func.sum(case((tx.type == "income", self.amount), else_=0.0)),
+            func.sum(case((tx.type == "income", 0.0), else_=self.amount)),
+        ).group_by(tx.date).order_by(tx.date).all()
+        days = [row[0] for row in rows]
+        income = [row[1] for row in rows]
+        expenses = [row[2] for row in rows]
+        balance = list(accumulate(i - e for i, e in zip(income, expenses)))
+        total_points = len(days)
+        if max_points and total_points > max_points:
+            keep = downsample.select([day.toordinal() for day in days], [income, expenses, balance], max_points, method)
+            days, income, expenses, balance = ([values[i] for i in keep] for values in (days, income, expenses, balance))
+        return {
+            "dates": days,
+            "income": income,
+            "expenses": expenses,
+            "balance": balance,
+            "total_points": total_points,
+        }
 
     def income_vs_expenses(self) -> Dict[str, float]:
-        transactions = self.get_transactions()
-        total_income = sum(tx.amount for tx in transactions if tx.type == "income")
-        total_expenses = sum(tx.amount for tx in transactions if tx.type == "expense")
-        
+        totals = self._totals()
         return {
-            "income": total_income,
-            "expenses": total_expenses,
-            "net": total_income - total_expenses,
+            "income": totals.income,
+            "expenses": totals.expenses,
+            "net": totals.income - totals.expenses,
         }
 
     def budget_status(self) -> Dict[str, Dict]:
         budgets = crud.get_budgets(self.db, self.user_id)
-        transactions = self.get_transactions()
-        
+        spent_by_category = self._expenses_by_category() if budgets else {}
+
         budget_status = {}
         for budget in budgets:
-            spent = sum(tx.amount for tx in transactions if tx.category == budget.category and tx.type == "expense")
+            spent = spent_by_category.get(budget.category, 0.0)
             percentage = (spent / budget.limit_amount * 100) if budget.limit_amount > 0 else 0
             budget_status[budget.category] = {
                 "limit": budget.limit_amount,
@@ -63,22 +201,42 @@ class ReportGenerator:
                 "remaining": max(0, budget.limit_amount - spent),
                 "percentage": min(100, percentage),
             }
-        
+
         return budget_status
 
     def goal_progress(self) -> Dict[str, Dict]:
-        goals = crud.get_goals(self.db, self.user_id)
-        goal_progress = {}
-        
-        for goal in goals:
-            percentage = (goal.current_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
-            days_left = (goal.deadline - datetime.now().date()).days if goal.deadline else 0
-            goal_progress[goal.name] = {
-                "target": goal.target_amount,
-                "current": goal.current_amount,
-                "percentage": min(100, percentage),
-                "completed": goal.completed,
-                "days_left": max(0, days_left),
+        # Progress is kept current by contributions, so one query over the
+        # goals table is all it takes; the date arithmetic runs in SQL too.
+        goal = models.Goal
+        today = date.today()
+        if self.db.get_bind().dialect.name == "sqlite":
+            days = cast(func.julianday(goal.deadline) - func.julianday(today), Integer)
+        else:
+            days = goal.deadline - today
+        percentage = case(
+            (goal.target_amount <= 0, 0.0),
+            (goal.current_amount >= goal.target_amount, 100.0),
+            else_=goal.current_amount * 100.0 / goal.target_amount,
+        )
+        rows = (
+            self.db.query(
+                goal.name,
+                goal.target_amount,
+                goal.current_amount,
+                percentage.label("percentage"),
+                goal.completed,
+                case((days < 0, 0), else_=days).label("days_left"),
+            )
+            .filter(goal.user_id == self.user_id)
+            .all()
+        )
+        return {
+            row.name: {
+                "target": row.target_amount,
+                "current": row.current_amount,
+                "percentage": row.percentage,
+                "completed": row.completed,
+                "days_left": row.days_left,
             }
-        
-        return goal_progress
+            for row in rows
+        }
@@ -1,13 +1,63 @@
-import requests
-import re
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+import logging
+from itertools import repeat
+from typing import Iterable, List, Dict, Optional
+
+from app.services import statements
+
+# requests and BeautifulSoup are imported where they are used: they are
+# comparatively slow to import and most processes never scrape anything.
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoup backends, fastest first. lxml is a C parser; html5lib is pure
+# Python and much slower, but parses broken markup exactly like a browser.
+PARSERS = ("lxml", "html.parser", "html5lib")
+
+
+def _available_parser(parser: str) -> str:
+    from bs4.builder import builder_registry
+
+    if builder_registry.lookup(parser) is not None:
+        return parser
+    fallback = next(name for name in PARSERS if builder_registry.lookup(name) is not None)
+    logger.warning("HTML parser %r is not installed; using %r", parser, fallback)
+    return fallback
+
+
+def _sanitize_with_lxml(html: str) -> str:
+    import lxml.html
+    from lxml import etree
+
+    if not html.strip():
+        return ""
+    root = lxml.html.document_fromstring(html)
+    etree.strip_elements(root, "script", "style", with_tail=False)
+    return " ".join(root.text_content().split())
+
+
+def sanitize_document(html: str, parser: str = "lxml") -> str:
+    """Visible text of ``html`` with scripts and styles removed and whitespace collapsed."""
+    from bs4 import BeautifulSoup
+
+    try:
+        parser = _available_parser(parser)
+        if parser == "lxml":
+            # Same text as BeautifulSoup over lxml, without building a soup tree.
+            return _sanitize_with_lxml(html)
+        soup = BeautifulSoup(html, parser)
+        for tag in soup(["script", "style"]):
+            tag.decompose()
+        return " ".join(soup.get_text().split())
+    except Exception as e:
+        logger.warning("HTML sanitization failed: %s", e)
+        return html
 
 
 class FinancialScraper:
 
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, parser: str = "lxml"):
         self.timeout = timeout
+        self.parser = parser
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
@@ -43,26 +93,11 @@ class FinancialScraper:
         return tips
 
     def scrape_exchange_rates(self, base_currency: str = "USD") -> Optional[Dict[str, float]]:
-        fallback_rates = {
-            "USD": 1.0,
-            "EUR": 0.92,
-            "GBP": 0.79,
-            "JPY": 149.5,
-            "CAD": 1.36,
-            "AUD": 1.53,
-            "CHF": 0.88,
-            "CNY": 7.08,
-        }
+        # Cached, pooled and persisted by the shared service; it logs failures
+        # and falls back to built-in rates when upstream has never answered.
+        from app.services.fx import exchange_rates
 
-        try:
-            url = f"https://api.exchangerate-api.com/v4/latest/{base_currency}"
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("rates", fallback_rates)
-        except Exception as e:
-            print(f"Exchange rate scraping failed: {e}. Using fallback rates.")
-            return fallback_rates
+        return exchange_rates.get_rates(base_currency)
 
     def scrape_financial_quotes(self) -> List[Dict[str, str]]:
         quotes = [
@@ -90,18 +125,30 @@ class FinancialScraper:
         return quotes
 
     def extract_numbers_from_text(self, text: str) -> List[float]:
-        pattern = r"-?\d+\.?\d*"
-        matches = re.findall(pattern, text)
-        return [float(match) for match in matches if match and match != "."]
-
-    def sanitize_html(self, html: str) -> str:
-        try:
-            soup = BeautifulSoup(html, "html5lib")
-            for tag in soup(["script", "style"]):
-                tag.decompose()
-            text = soup.get_text()
-            text = " ".join(text.split())
-            return text
-        except Exception as e:
-            print(f"HTML sanitization failed: {e}")
-            return html
+        """Every amount in ``text``; see ``statements.AmountParser`` for the accepted formats."""
+        return statements.DEFAULT_AMOUNTS.find_all(text)
+
+    def sanitize_html(self, html: str, parser: Optional[str] = None) -> str:
+        """Pass ``parser="html5lib"`` where browser-exact handling of broken markup matters."""
+        return sanitize_document(html, parser or self.parser)
+
+    def sanitize_many(
+        self,
+        documents: Iterable[str],
+        parser: Optional[str] = None,
+        workers: Optional[int] = None,
+        chunksize: int = 8,
+    ) -> List[str]:
+        """Sanitize many documents across a process pool, keeping their order.
+
+        Parsing holds the GIL, so threads would not help; small batches run in
+        this process because starting workers costs more than it saves.
+        """
+        documents = list(documents)
+        parser = parser or self.parser
+        if workers == 1 or len(documents) <= chunksize:
+            return [sanitize_document(html, parser) for html in documents]
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(sanitize_document, documents, repeat(parser), chunksize=chunksize))
@@ -0,0 +1,268 @@
+"""Streaming bank-statement import.
+
+Statements are read one line (CSV, text) or one table row (HTML) at a time
+and parsed with precompiled, locale-aware amount and date parsers. Rows flow
+through generators into batched inserts, so memory use does not depend on the
+statement's size.
+"""
+
+import csv
+import re
+from datetime import date
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+# Decimal separator and accepted thousands separators per locale.
+LOCALES = {
+    "en": (".", ",'"),
+    "de": (",", ".'"),
+    "fr": (",", " \u00a0\u202f."),
+    "ch": (".", "'\u2019"),
+}
+CURRENCY_SYMBOLS = "$€£¥₹₩₽₺₪₫₱฿"
+MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",), ("jun", "june"),
+         ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"),
+         ("dec", "december")],
+        start=1,
+    )
+    for name in names
+}
+
+
+class AmountParser:
+    """Money amounts such as ``1,234.56``, ``(45.00)``, ``-$12``, ``€1.234,56`` or ``99.90-``.
+
+    Parentheses and leading or trailing minus signs make an amount negative;
+    currency symbols and ISO codes next to the number are ignored.
+    """
+
+    def __init__(self, locale: str = "en"):
+        decimal, thousands = LOCALES[locale]
+        self.decimal = decimal
+        self._thousands = re.compile(f"[{re.escape(thousands)}]")
+        group = f"[{re.escape(thousands)}]"
+        number = rf"\d{{1,3}}(?:{group}\d{{3}})+(?:{re.escape(decimal)}\d+)?|\d+(?:{re.escape(decimal)}\d+)?"
+        currency = rf"(?:[{CURRENCY_SYMBOLS}]|\b[A-Z]{{3}}\b)"
+        self._pattern = re.compile(
+            rf"(?P<open>\()?\s*(?P<sign>[-−])?\s*{currency}?\s*(?P<sign2>[-−])?\s*"
+            rf"(?P<number>{number})(?!\d)\s*(?:{currency})?(?P<trailing>-(?![\d]))?\s*(?P<close>\))?"
+        )
+
+    def has_decimals(self, match: re.Match) -> bool:
+        return self.decimal in match.group("number")
+
+    def value(self, match: re.Match) -> float:
+        digits = self._thousands.sub("", match.group("number"))
+        if self.decimal != ".":
+            digits = digits.replace(self.decimal, ".")
+        value = float(digits)
+        negative = (
+            bool(match.group("open") and match.group("close"))
+            or bool(match.group("sign") or match.group("sign2") or match.group("trailing"))
+        )
+        return -value if negative else value
+
+    def find_all(self, text: str) -> List[float]:
+        return [self.value(match) for match in self._pattern.finditer(text)]
+
+    def matches(self, text: str) -> List[re.Match]:
+        return list(self._pattern.finditer(text))
+
+    def parse(self, text: str) -> Optional[float]:
+        """The single amount in ``text`` (a table cell, for instance), or None."""
+        match = self._pattern.search(text)
+        return self.value(match) if match else None
+
+
+class DateParser:
+    """Dates as ISO ``2024-03-15``, numeric ``15/03/2024`` or ``03.15.24``, or ``15 Mar 2024``/``Mar 15, 2024``."""
+
+    _iso = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+    _numeric = re.compile(r"\b(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{4}|\d{2})\b")
+    _day_month = re.compile(r"\b(\d{1,2})\s+([A-Za-z]{3,9})\.?,?\s+(\d{4})\b")
+    _month_day = re.compile(r"\b([A-Za-z]{3,9})\.?\s+(\d{1,2}),?\s+(\d{4})\b")
+
+    def __init__(self, day_first: bool = False):
+        self.day_first = day_first
+
+    def search(self, text: str) -> Optional[Tuple[re.Match, date]]:
+        """The first valid date in ``text`` and where it was found."""
+        for pattern in (self._iso, self._numeric, self._day_month, self._month_day):
+            for match in pattern.finditer(text):
+                value = self._build(pattern, match)
+                if value is not None:
+                    return match, value
+        return None
+
+    def parse(self, text: str) -> Optional[date]:
+        found = self.search(text)
+        return found[1] if found else None
+
+    def _build(self, pattern: re.Pattern, match: re.Match) -> Optional[date]:
+        a, b, c = match.groups()
+        try:
+            if pattern is self._iso:
+                return date(int(a), int(b), int(c))
+            if pattern is self._numeric:
+                day, month = (a, b) if self.day_first else (b, a)
+                year = int(c) + (2000 if len(c) == 2 else 0)
+                return date(year, int(month), int(day))
+            if pattern is self._day_month:
+                return date(int(c), MONTHS[b.lower()], int(a))
+            return date(int(c), MONTHS[a.lower()], int(b))
+        except (KeyError, ValueError):
+            return None
+
+
+class StatementRow(NamedTuple):
+
+    date: date
+    description: str
+    amount: float  # negative for money going out
+
+
+class StatementParser:
+
+    DATE_HEADERS = ("date", "posted", "booking date", "transaction date", "datum", "fecha")
+    DESCRIPTION_HEADERS = (
+        "description", "details", "memo", "payee", "merchant", "narrative", "reference",
+        "beschreibung", "verwendungszweck", "buchungstext", "libellé",
+    )
+    AMOUNT_HEADERS = ("amount", "value", "betrag", "montant")
+    DEBIT_HEADERS = ("debit", "withdrawal", "money out", "paid out")
+    CREDIT_HEADERS = ("credit", "deposit", "money in", "paid in")
+
+    def __init__(self, locale: str = "en", day_first: Optional[bool] = None):
+        self.amounts = AmountParser(locale)
+        self.dates = DateParser(locale != "en" if day_first is None else day_first)
+
+    def csv_rows(self, lines: Iterable[str], delimiter: Optional[str] = None) -> Iterator[StatementRow]:
+        lines = iter(lines)
+        first = next(lines, "")
+        if delimiter is None:
+            delimiter = max(",;\t|", key=first.count)
+        reader = csv.reader(_chain_first(first, lines), delimiter=delimiter)
+        yield from self._table_rows(reader)
+
+    def html_rows(self, source: BinaryIO) -> Iterator[StatementRow]:
+        """Rows of every table in an HTML document, parsed incrementally from a binary file."""
+        from lxml import etree
+
+        def cells() -> Iterator[List[str]]:
+            for _, row in etree.iterparse(source, events=("end",), tag="tr", html=True, recover=True):
+                yield [" ".join("".join(cell.itertext()).split()) for cell in row if cell.tag in ("td", "th")]
+                # Drop parsed rows so the tree does not grow with the document.
+                row.clear()
+                while row.getprevious() is not None:
+                    del row.getparent()[0]
+
+        yield from self._table_rows(cells())
+
+    def text_rows(self, lines: Iterable[str]) -> Iterator[StatementRow]:
+        """Lines shaped like ``<date> <description> <amount> [<balance>]``; others are skipped.
+
+        The amount is the first number with decimals after the date, so that
+        reference numbers in the description are not taken for it.
+        """
+        for line in lines:
+            found = self.dates.search(line)
+            if found is None:
+                continue
+            match, day = found
+            rest = line[match.end():]
+            candidates = self.amounts.matches(rest)
+            amount = next((m for m in candidates if self.amounts.has_decimals(m)), None)
+            if amount is None and candidates:
+                amount = candidates[-1]
+            if amount is None:
+                continue
+            description = " ".join(rest[:amount.start()].split())
+            yield StatementRow(day, description, self.amounts.value(amount))
+
+    def _table_rows(self, rows: Iterable[Sequence[str]]) -> Iterator[StatementRow]:
+        columns = None
+        for cells in rows:
+            if not cells:
+                continue
+            if columns is None:
+                columns = self._columns(cells)
+                if columns is not None:
+                    continue
+                # No header: assume date, description, amount.
+                columns = (0, 1, 2, None, None)
+            row = self._row(cells, columns)
+            if row is not None:
+                yield row
+
+    def _columns(self, header: Sequence[str]):
+        names = [cell.strip().lower() for cell in header]
+
+        def find(candidates):
+            return next((index for index, name in enumerate(names) if name in candidates), None)
+
+        date_column = find(self.DATE_HEADERS)
+        if date_column is None:
+            return None
+        return (
+            date_column,
+            find(self.DESCRIPTION_HEADERS),
+            find(self.AMOUNT_HEADERS),
+            find(self.DEBIT_HEADERS),
+            find(self.CREDIT_HEADERS),
+        )
+
+    def _row(self, cells: Sequence[str], columns) -> Optional[StatementRow]:
+        date_column, description_column, amount_column, debit_column, credit_column = columns
+
+        def cell(index):
+            return cells[index] if index is not None and index < len(cells) else ""
+
+        day = self.dates.parse(cell(date_column))
+        if day is None:
+            return None
+        amount = self.amounts.parse(cell(amount_column)) if amount_column is not None else None
+        if amount is None:
+            debit = self.amounts.parse(cell(debit_column))
+            credit = self.amounts.parse(cell(credit_column))
+            if debit is None and credit is None:
+                return None
+            amount = (credit or 0.0) - abs(debit or 0.0)
+        return StatementRow(day, cell(description_column).strip(), amount)
+
+
+def _chain_first(first: str, rest: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+def transaction_rows(
+    user_id: str, rows: Iterable[StatementRow], category: Optional[str] = None, currency: Optional[str] = None
+) -> Iterator[dict]:
+    """Map statement rows onto ``transactions`` columns: outflows become expenses.
+
+    Without ``category`` the rows are left for ``categorize.Categorizer.fill``.
+    """
+    for row in rows:
+        if not row.amount:
+            continue
+        yield {
+            "user_id": user_id,
+            "amount": abs(row.amount),
+            "type": "expense" if row.amount < 0 else "income",
+            "category": category,
+            "description": row.description[:500] or None,
+            "method": "bank",
+            "currency": currency,
+            "date": row.date,
+        }
+
+
+def open_text(binary: BinaryIO, encoding: str = "utf-8-sig") -> TextIO:
+    import io
+
+    return io.TextIOWrapper(binary, encoding=encoding, errors="replace", newline="")
+
+
+DEFAULT_AMOUNTS = AmountParser("en")
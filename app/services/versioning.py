@@ -0,0 +1,100 @@
+"""Per-user data versions used to build cheap ETags for read endpoints."""
+
+import secrets
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import select
+
+from app.config import settings
+
+
+class DataVersionStore:
+
+    def __init__(self):
+        # Versions restart at zero with the process, so the epoch keeps ETags
+        # handed out by a previous process from matching the new counters.
+        self.epoch = secrets.token_hex(4)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_id: str) -> int:
+        with self._lock:
+            version = self._versions.get(user_id, 0) + 1
+            self._versions[user_id] = version
+        return version
+
+
+class DatabaseDataVersionStore:
+    """Versions kept in the ``data_versions`` table, shared by every worker process.
+
+    Each bump is a single upsert, so concurrent workers never lose an
+    increment. The epoch is stored in the same table and only changes when the
+    database is recreated.
+    """
+
+    EPOCH_KEY = ""
+
+    def __init__(self, bind=None):
+        self._bind = bind
+        self._epoch: Optional[str] = None
+
+    @property
+    def bind(self):
+        if self._bind is None:
+            from app.database import engine
+            self._bind = engine
+        return self._bind
+
+    @property
+    def table(self):
+        from app.models import DataVersion
+        return DataVersion.__table__
+
+    def _insert(self):
+        if self.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert(self.table)
+
+    @property
+    def epoch(self) -> str:
+        if self._epoch is None:
+            with self.bind.begin() as connection:
+                connection.execute(
+                    self._insert()
+                    .values(user_id=self.EPOCH_KEY, version=secrets.randbits(31))
+                    .on_conflict_do_nothing(index_elements=["user_id"])
+                )
+                self._epoch = format(self._read(connection, self.EPOCH_KEY), "x")
+        return self._epoch
+
+    def _read(self, connection, user_id: str) -> int:
+        table = self.table
+        return connection.execute(select(table.c.version).where(table.c.user_id == user_id)).scalar() or 0
+
+    def get(self, user_id: str) -> int:
+        with self.bind.connect() as connection:
+            return self._read(connection, user_id)
+
+    def bump(self, user_id: str) -> int:
+        table = self.table
+        statement = self._insert().values(user_id=user_id, version=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id"], set_={"version": table.c.version + 1}
+        ).returning(table.c.version)
+        with self.bind.begin() as connection:
+            return connection.execute(statement).scalar_one()
+
+
+def _create_store():
+    if settings.DATA_VERSION_BACKEND == "database":
+        return DatabaseDataVersionStore()
+    return DataVersionStore()
+
+
+data_versions = _create_store()
@@ -0,0 +1 @@
+"""Local performance benchmarks. See each module's docstring for usage."""
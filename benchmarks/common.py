@@ -0,0 +1,36 @@
+"""Helpers shared by the benchmark scripts.
+
+``use_temporary_database`` must run before anything under ``app`` is imported,
+because the settings and the engine are created at import time.
+"""
+
+import os
+import tempfile
+
+PASSWORD = "benchmark-password"
+
+
+def use_temporary_database() -> str:
+    directory = tempfile.mkdtemp(prefix="finance-bench-")
+    path = os.path.join(directory, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def seed_ledger(email: str, transactions: int, seed: int = 42) -> str:
+    """Create a user with ``transactions`` rows, budgets of every period and goals."""
+    from app.database import SessionLocal, init_db
+    from benchmarks.synthetic import generate
+
+    init_db()
+    db = SessionLocal()
+    try:
+        return generate(db, [email], transactions, seed)[0]
+    finally:
+        db.close()
+
+
+def login_headers(client, email: str) -> dict:
+    response = client.post("/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,71 @@
+"""Bytes on the wire and latency of the Streamlit pages per response encoding.
+
+Runs the API in-process against a throwaway SQLite database:
+
+    python -m benchmarks.compression --transactions 5000 --repeat 20
+
+Latency is measured in-process, so it includes compression cost but no
+network time; the transfer estimate adds the time the measured bytes take at
+``--bandwidth-mbit``.
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.common import login_headers, seed_ledger, use_temporary_database
+
+# The API calls each Streamlit page makes on a render.
+PAGES = {
+    "Dashboard": ["/dashboard", "/reports/category", "/reports/monthly", "/transactions/?limit=5", "/reports/goals"],
+    "Transactions": ["/transactions/?limit=1000"],
+    "Budgets": ["/reports/budgets"],
+    "Goals": ["/reports/goals"],
+    "Reports": ["/reports/category", "/reports/monthly"],
+}
+
+
+def measure_page(client, headers, endpoints, repeat):
+    latencies = []
+    wire_bytes = 0
+    for _ in range(repeat):
+        wire_bytes = 0
+        started = time.perf_counter()
+        for endpoint in endpoints:
+            response = client.get(endpoint, headers=headers)
+            response.raise_for_status()
+            wire_bytes += response.num_bytes_downloaded
+        latencies.append(time.perf_counter() - started)
+    return wire_bytes, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--bandwidth-mbit", type=float, default=10.0)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.middleware.compression import available_encodings
+
+    email = "compression-bench@example.com"
+    seed_ledger(email, args.transactions)
+    client = TestClient(app)
+    headers = login_headers(client, email)
+    bytes_per_second = args.bandwidth_mbit * 1_000_000 / 8
+
+    print(f"{'page':<14}{'encoding':<10}{'wire bytes':>12}{'median ms':>12}{'+transfer ms':>14}")
+    for page, endpoints in PAGES.items():
+        for encoding in ["identity", *available_encodings()]:
+            wire_bytes, latency = measure_page(
+                client, {**headers, "Accept-Encoding": encoding}, endpoints, args.repeat
+            )
+            total_ms = (latency + wire_bytes / bytes_per_second) * 1000
+            print(f"{page:<14}{encoding:<10}{wire_bytes:>12,}{latency * 1000:>12.1f}{total_ms:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Latency of the crud and report hot paths at several ledger sizes.
+
+Each size gets its own user in a throwaway SQLite database:
+
+    python -m benchmarks.hot_paths                          # 1k, 100k and 1M transactions
+    python -m benchmarks.hot_paths --sizes 1000,100000 --save-baseline
+    python -m benchmarks.hot_paths --sizes 1000,100000      # compare with the baseline
+
+Results are compared with ``--baseline`` (JSON) when it exists, and the run
+exits with status 1 when a case's median is more than ``--threshold`` slower
+than its baseline. Baselines are machine-specific; record one per machine.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.common import login_headers, seed_ledger, use_temporary_database
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+REPORT_METHODS = [
+    "dashboard_summary", "category_summary", "monthly_trend",
+    "income_vs_expenses", "budget_status", "goal_progress",
+]
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    min_delta_ms: float = 1.0,
+) -> List[str]:
+    """Cases whose median grew by more than ``threshold`` (a fraction) and ``min_delta_ms``."""
+    regressions = []
+    for case, result in results.items():
+        before = baseline.get(case)
+        if before is None:
+            continue
+        delta = result["median_ms"] - before["median_ms"]
+        if delta > before["median_ms"] * threshold and delta > min_delta_ms:
+            regressions.append(
+                f"{case}: {before['median_ms']:.2f} ms -> {result['median_ms']:.2f} ms "
+                f"(+{delta / before['median_ms'] * 100:.0f}%)"
+            )
+    return regressions
+
+
+def run_size(client, size: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    from app import crud
+    from app.database import SessionLocal
+    from app.routers.auth import get_current_user
+    from app.services.reports import ReportGenerator
+
+    email = f"bench-{size}@example.com"
+    user_id = seed_ledger(email, size)
+    results = {}
+
+    def case(name: str, fn: Callable[[], object], times: int = repeat) -> None:
+        results[f"{name}[{size}]"] = measure(fn, times)
+
+    db = SessionLocal()
+    try:
+        case("crud.get_transactions first page", lambda: crud.get_transactions(db, user_id, skip=0, limit=100))
+        case("crud.get_transactions middle page",
+             lambda: crud.get_transactions(db, user_id, skip=size // 2, limit=100))
+        for method in REPORT_METHODS:
+            # A fresh generator per call, as each request builds its own.
+            case(f"ReportGenerator.{method}", lambda method=method: getattr(ReportGenerator(db, user_id), method)())
+    finally:
+        db.close()
+
+    # Password hashing dominates login, so a few rounds are enough.
+    case("POST /auth/login", lambda: login_headers(client, email), times=min(repeat, 5))
+    headers = login_headers(client, email)
+
+    token = headers["Authorization"].split(" ", 1)[1]
+    db = SessionLocal()
+    try:
+        case("auth token check", lambda: asyncio.run(get_current_user(token, db)))
+    finally:
+        db.close()
+
+    case("GET /dashboard", lambda: client.get("/dashboard", headers=headers).raise_for_status())
+
+    created: List[int] = []
+    payload = {"amount": 12.5, "type": "expense", "category": "Food", "date": "2024-01-15"}
+
+    def create():
+        response = client.post("/transactions/", json=payload, headers=headers)
+        response.raise_for_status()
+        created.append(response.json()["id"])
+
+    case("POST /transactions/", create)
+    pending = list(created)
+    case("PUT /transactions/{id}", lambda: client.put(
+        f"/transactions/{pending.pop()}", json={"amount": 13.0}, headers=headers
+    ).raise_for_status())
+    case("DELETE /transactions/{id}", lambda: client.delete(
+        f"/transactions/{created.pop()}", headers=headers
+    ).raise_for_status())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="comma-separated transaction counts")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    use_temporary_database()
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    results: Dict[str, Dict[str, float]] = {}
+    with TestClient(app) as client:
+        for size in (int(value) for value in args.sizes.split(",")):
+            results.update(run_size(client, size, args.repeat))
+
+    print(f"{'case':<52}{'median ms':>12}{'p95 ms':>12}")
+    for name, result in results.items():
+        print(f"{name:<52}{result['median_ms']:>12.2f}{result['p95_ms']:>12.2f}")
+
+    if args.save_baseline:
+        document = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+        return
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Import-time profile of the API, based on ``python -X importtime``.
+
+    python -m benchmarks.import_time            # top 20 modules by cumulative time
+    python -m benchmarks.import_time --top 50 --module app.main
+
+tests/test_import_time.py enforces a budget on the same measurement.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure_import(module: str = "app.main", runs: int = 3) -> Dict[str, Tuple[int, int]]:
+    """(self, cumulative) import time in microseconds per module, best of ``runs``.
+
+    Each run is a fresh interpreter; the best run discards one-off costs such
+    as bytecode compilation on the first import.
+    """
+    best: Dict[str, int] = {}
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "0"}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, cwd=ROOT, env=env, check=True,
+        )
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            own, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = (int(own), int(cumulative))
+        if module not in best or times[module][1] < best[module][1]:
+            best = times
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    times = measure_import(args.module)
+    own_total = sum(own for name, (own, _) in times.items() if name.split(".")[0] == "app")
+    print(f"{args.module}: {times[args.module][1] / 1000:.1f} ms total, {own_total / 1000:.1f} ms in app modules")
+    print(f"{'self ms':>10}{'cumulative ms':>15}  module")
+    for name, (own, cumulative) in sorted(times.items(), key=lambda item: -item[1][1])[: args.top]:
+        print(f"{own / 1000:>10.1f}{cumulative / 1000:>15.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""HTTP load test against a locally started uvicorn serving ``app.main:app``.
+
+    python -m benchmarks.load_test --users 50 --duration 30 --workers 2
+    python -m benchmarks.load_test --mix dashboard=5,reports=3,list=3,write=2,login=1
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --users 20   # existing server
+
+Unless ``--url`` is given, the server runs in a subprocess against a fresh
+SQLite database seeded with ``benchmarks.synthetic``. With ``--url``, the
+target must already hold the ``loadtest<n>@example.com`` users; seed them with
+``python -m benchmarks.synthetic --email-prefix loadtest``. Each simulated user
+logs in, then sends requests drawn from the mix until the duration is over.
+The report shows throughput and p50/p95/p99 latency per endpoint.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import PASSWORD, use_temporary_database
+
+DEFAULT_MIX = "dashboard=4,reports=3,list=3,write=2,login=1"
+REPORT_PATHS = ["/reports/summary", "/reports/category", "/reports/monthly", "/reports/budgets", "/reports/goals"]
+LIST_PATHS = ["/transactions/?limit=100", "/budgets/", "/goals/"]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("dashboard", "reports", "list", "write", "login"):
+            raise SystemExit(f"Unknown traffic type in --mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class Recorder:
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return None
+        self.latencies[label].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, email: str) -> Dict[str, str]:
+    response = await recorder.request(
+        client, "POST /auth/login", "POST", "/auth/login", data={"username": email, "password": PASSWORD}
+    )
+    if response is None or response.status_code != 200:
+        raise RuntimeError(f"Login failed for {email}")
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def simulated_user(
+    client: httpx.AsyncClient, recorder: Recorder, email: str, weights: Dict[str, float], deadline: float, seed: int
+) -> None:
+    rng = random.Random(seed)
+    headers = await login(client, recorder, email)
+    created: List[int] = []
+    kinds, kind_weights = list(weights), list(weights.values())
+    while time.perf_counter() < deadline:
+        kind = rng.choices(kinds, kind_weights)[0]
+        if kind == "dashboard":
+            await recorder.request(client, "GET /dashboard", "GET", "/dashboard", headers=headers)
+        elif kind == "reports":
+            path = rng.choice(REPORT_PATHS)
+            await recorder.request(client, f"GET {path}", "GET", path, headers=headers)
+        elif kind == "list":
+            path = rng.choice(LIST_PATHS)
+            await recorder.request(client, f"GET {path.split('?')[0]}", "GET", path, headers=headers)
+        elif kind == "login":
+            headers = await login(client, recorder, email)
+        elif created and rng.random() < 0.3:
+            await recorder.request(
+                client, "DELETE /transactions/{id}", "DELETE", f"/transactions/{created.pop()}", headers=headers
+            )
+        elif created and rng.random() < 0.4:
+            await recorder.request(
+                client, "PUT /transactions/{id}", "PUT", f"/transactions/{rng.choice(created)}",
+                json={"amount": round(rng.uniform(1, 200), 2)}, headers=headers,
+            )
+        else:
+            response = await recorder.request(client, "POST /transactions/", "POST", "/transactions/", json={
+                "amount": round(rng.uniform(1, 200), 2), "type": "expense",
+                "category": rng.choice(["Food", "Transport", "Shopping"]), "date": time.strftime("%Y-%m-%d"),
+            }, headers=headers)
+            if response is not None and response.status_code == 201:
+                created.append(response.json()["id"])
+
+
+async def run_load(url: str, users: int, duration: float, weights: Dict[str, float], seed: int) -> Recorder:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            simulated_user(client, recorder, f"loadtest{index}@example.com", weights, deadline, seed + index)
+            for index in range(users)
+        ))
+    return recorder
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30 s")
+
+
+def report(recorder: Recorder, duration: float) -> Dict[str, Dict[str, float]]:
+    rows = {}
+    for label in sorted(recorder.latencies, key=lambda name: -len(recorder.latencies[name])):
+        latencies = recorder.latencies[label]
+        rows[label] = {
+            "requests": len(latencies),
+            "errors": recorder.errors.get(label, 0),
+            "rps": round(len(latencies) / duration, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        }
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="relative weights of traffic types")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--transactions", type=int, default=200_000, help="rows seeded across the users")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--json", type=argparse.FileType("w"), help="also write the results as JSON")
+    args = parser.parse_args()
+    weights = parse_mix(args.mix)
+
+    server = None
+    url = args.url
+    if url is None:
+        use_temporary_database()
+        from app.database import SessionLocal, init_db
+        from benchmarks.synthetic import generate
+
+        init_db()
+        db = SessionLocal()
+        try:
+            emails = [f"loadtest{index}@example.com" for index in range(args.users)]
+            generate(db, emails, args.transactions, args.seed)
+        finally:
+            db.close()
+        port = free_port()
+        server = start_server(port, args.workers)
+        url = f"http://127.0.0.1:{port}"
+
+    try:
+        started = time.perf_counter()
+        recorder = asyncio.run(run_load(url, args.users, args.duration, weights, args.seed))
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    rows = report(recorder, elapsed)
+    total = sum(row["requests"] for row in rows.values())
+    errors = sum(row["errors"] for row in rows.values())
+    print(f"{args.users} users, {args.workers} worker(s), {elapsed:.1f} s: "
+          f"{total:,} requests, {total / elapsed:.1f} req/s, {errors} errors\n")
+    print(f"{'endpoint':<30}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for label, row in rows.items():
+        print(f"{label:<30}{row['requests']:>10,}{row['errors']:>8}{row['rps']:>9.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}")
+    if args.json:
+        json.dump({"users": args.users, "workers": args.workers, "duration": elapsed, "endpoints": rows},
+                  args.json, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""HTML sanitization throughput per BeautifulSoup parser, single and batched.
+
+    python -m benchmarks.sanitize --rows 500 --documents 64 --workers 4
+
+Documents look like an online-banking statement export: page chrome, inline
+scripts and styles, and a transactions table of ``--rows`` rows.
+"""
+
+import argparse
+import os
+import random
+import time
+
+from app.services.scraper import PARSERS, FinancialScraper, sanitize_document
+
+
+def statement_html(rows: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    merchants = ["GROCERY MART", "CITY TRANSIT", "COFFEE HOUSE", "ONLINE STORE", "UTILITY CO", "PAYROLL"]
+    body = []
+    for index in range(rows):
+        amount = rng.uniform(1, 500)
+        body.append(
+            f'<tr class="{"odd" if index % 2 else "even"}"><td class="date">2024-{rng.randint(1, 12):02d}-'
+            f'{rng.randint(1, 28):02d}</td><td class="desc"><span>{rng.choice(merchants)}</span> '
+            f'<small>REF {rng.randrange(10**8):08d}</small></td><td class="amount">'
+            f'{"-" if rng.random() < 0.9 else ""}${amount:,.2f}</td><td class="balance">${rng.uniform(0, 9999):,.2f}</td></tr>'
+        )
+    return (
+        "<!DOCTYPE html><html><head><title>Account statement</title>"
+        "<style>table{border-collapse:collapse} td{padding:2px 6px} .amount{text-align:right}</style>"
+        "<script>window.analytics=window.analytics||[];analytics.push(['page','statement']);</script>"
+        "</head><body><header><nav><a href='/'>Home</a> | <a href='/accounts'>Accounts</a></nav></header>"
+        "<h1>Checking account ****1234</h1><p>Statement period: 2024-01-01 to 2024-12-31</p>"
+        "<table><thead><tr><th>Date</th><th>Description</th><th>Amount</th><th>Balance</th></tr></thead>"
+        f"<tbody>{''.join(body)}</tbody></table>"
+        "<footer><p>Member FDIC.</p><script>trackFooter();</script></footer></body></html>"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="transactions per statement")
+    parser.add_argument("--documents", type=int, default=64, help="statements per batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = [statement_html(args.rows, seed) for seed in range(args.documents)]
+    size_kb = len(documents[0].encode("utf-8")) / 1024
+    print(f"{args.documents} statements of {args.rows} rows ({size_kb:.0f} KiB each), {args.workers} workers\n")
+    print(f"{'parser':<13}{'ms/doc':>10}{'batch docs/s':>15}{'sequential docs/s':>20}")
+    scraper = FinancialScraper()
+    for name in PARSERS:
+        single = min(_timed(lambda: sanitize_document(documents[0], name)) for _ in range(args.repeat))
+        sequential = _timed(lambda: scraper.sanitize_many(documents, name, workers=1))
+        batched = _timed(lambda: scraper.sanitize_many(documents, name, workers=args.workers))
+        print(f"{name:<13}{single * 1000:>10.1f}{args.documents / batched:>15.1f}{args.documents / sequential:>20.1f}")
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Bulk synthetic ledgers for load and scale testing.
+
+Writes straight into the configured ``DATABASE_URL``:
+
+    python -m benchmarks.synthetic --users 20 --transactions 1000000 --seed 7
+
+Every user gets seasonal spending across many categories, a monthly salary,
+budgets of every period and goals with past and future deadlines. Columns are
+generated with numpy and inserted with batched executemany, so a million
+transactions load in well under a minute. Dates run up to a fixed end date
+(``--end-date``, default ``DEFAULT_END_DATE``), so the same seed always gives
+the same rows; only the salted password hash differs. Every user's password is
+``benchmarks.common.PASSWORD``.
+"""
+
+import argparse
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Sequence
+
+import numpy as np
+
+from benchmarks.common import PASSWORD
+
+# Category, share of expense rows, median amount.
+EXPENSE_CATEGORIES = [
+    ("Food", 0.24, 18.0), ("Groceries", 0.16, 45.0), ("Transport", 0.12, 12.0),
+    ("Entertainment", 0.08, 25.0), ("Shopping", 0.09, 40.0), ("Utilities", 0.05, 80.0),
+    ("Rent", 0.02, 1200.0), ("Health", 0.04, 35.0), ("Travel", 0.03, 250.0),
+    ("Education", 0.02, 60.0), ("Subscriptions", 0.06, 12.0), ("Gifts", 0.03, 50.0),
+    ("Insurance", 0.02, 110.0), ("Other", 0.04, 20.0),
+]
+INCOME_CATEGORIES = ["Freelance", "Interest", "Refund"]
+METHODS = np.array(["card", "cash", "bank"])
+METHOD_WEIGHTS = [0.65, 0.15, 0.2]
+BUDGET_PERIODS = {"weekly": 0.25, "monthly": 1.0, "yearly": 12.0}
+HISTORY_DAYS = 3 * 365
+DEFAULT_END_DATE = date(2024, 12, 31)
+
+
+def _day_weights(start: date, days: int) -> np.ndarray:
+    """Relative spend per day: a December peak, a summer bump and busier weekends."""
+    offsets = np.arange(days)
+    day_of_year = (np.datetime64(start) + offsets).astype("datetime64[D]")
+    doy = (day_of_year - day_of_year.astype("datetime64[Y]")).astype(int)
+    weekday = (offsets + start.weekday()) % 7
+    weights = (
+        1.0
+        + 0.35 * np.exp(-(((doy - 350) / 15.0) ** 2))
+        + 0.15 * np.exp(-(((doy - 200) / 30.0) ** 2))
+        + 0.2 * (weekday >= 5)
+    )
+    return weights / weights.sum()
+
+
+def _transaction_rows(rng: np.random.Generator, user_id: str, count: int, start: date) -> List[dict]:
+    days = np.arange(HISTORY_DAYS)
+    names = np.array([name for name, _, _ in EXPENSE_CATEGORIES])
+    shares = np.array([share for _, share, _ in EXPENSE_CATEGORIES])
+    medians = np.array([median for _, _, median in EXPENSE_CATEGORIES])
+
+    months = HISTORY_DAYS // 30
+    salary_count = min(months, count)
+    other_income = int((count - salary_count) * 0.03)
+    expenses = count - salary_count - other_income
+
+    category_index = rng.choice(len(names), size=expenses, p=shares / shares.sum())
+    amounts = np.concatenate([
+        np.round(rng.lognormal(np.log(medians[category_index]), 0.6), 2),
+        np.round(rng.normal(4200, 300, salary_count), 2),
+        np.round(rng.lognormal(np.log(150), 0.8, other_income), 2),
+    ])
+    categories = np.concatenate([
+        names[category_index],
+        np.full(salary_count, "Salary"),
+        rng.choice(INCOME_CATEGORIES, size=other_income),
+    ])
+    kinds = np.concatenate([np.full(expenses, "expense"), np.full(count - expenses, "income")])
+    offsets = np.concatenate([
+        rng.choice(days, size=expenses, p=_day_weights(start, HISTORY_DAYS)),
+        np.arange(salary_count) * 30,
+        rng.choice(days, size=other_income),
+    ])
+    methods = rng.choice(METHODS, size=count, p=METHOD_WEIGHTS)
+    day_list = [start + timedelta(days=int(offset)) for offset in range(HISTORY_DAYS)]
+    created_at = datetime.combine(start, datetime.min.time())
+
+    return [
+        {
+            "user_id": user_id,
+            "amount": max(float(amount), 0.01),
+            "type": kind,
+            "category": category,
+            "description": f"{category} #{index}",
+            "method": method,
+            "date": day_list[offset],
+            "created_at": created_at,
+        }
+        for index, (amount, kind, category, method, offset) in enumerate(zip(
+            amounts.tolist(), kinds.tolist(), categories.tolist(), methods.tolist(), offsets.tolist()
+        ))
+    ]
+
+
+def generate(
+    db,
+    emails: Sequence[str],
+    transactions: int,
+    seed: int = 42,
+    batch_size: int = 50_000,
+    end_date: date = DEFAULT_END_DATE,
+) -> List[str]:
+    """Create one user per email sharing ``transactions`` rows dated up to ``end_date``; return the user ids."""
+    from app import models
+    from app.utils.security import get_password_hash
+
+    rng = np.random.default_rng(seed)
+    start = end_date - timedelta(days=HISTORY_DAYS)
+    created_at = datetime.combine(start, datetime.min.time())
+    hashed_password = get_password_hash(PASSWORD)
+    # Uneven ledgers: a few heavy users, as in production.
+    per_user = rng.multinomial(transactions, rng.dirichlet(np.full(len(emails), 2.0)))
+
+    user_ids = [str(uuid.uuid5(uuid.NAMESPACE_URL, f"synthetic:{seed}:{email}")) for email in emails]
+    db.execute(models.User.__table__.insert(), [
+        {
+            "id": user_id, "email": email, "full_name": f"Synthetic User {index}",
+            "hashed_password": hashed_password, "role": "user", "currency": "USD", "created_at": created_at,
+        }
+        for index, (user_id, email) in enumerate(zip(user_ids, emails))
+    ])
+
+    budgets, goals = [], []
+    for user_id, count in zip(user_ids, per_user.tolist()):
+        rows = _transaction_rows(rng, user_id, count, start)
+        for offset in range(0, len(rows), batch_size):
+            db.execute(models.Transaction.__table__.insert(), rows[offset:offset + batch_size])
+
+        for category, _, median in EXPENSE_CATEGORIES[:8]:
+            for period, months in BUDGET_PERIODS.items():
+                budgets.append({
+                    "user_id": user_id, "category": category, "period": period, "created_at": created_at,
+                    "limit_amount": round(float(median * 25 * months * rng.uniform(0.7, 1.3)), 2),
+                })
+        for index in range(int(rng.integers(2, 7))):
+            target = round(float(rng.uniform(500, 20_000)), 2)
+            current = round(float(target * rng.uniform(0, 1.1)), 2)
+            goals.append({
+                "user_id": user_id, "name": f"Goal {index + 1}", "target_amount": target,
+                "current_amount": min(current, target), "completed": current >= target,
+                "deadline": end_date + timedelta(days=int(rng.integers(-180, 3 * 365))),
+                "created_at": created_at,
+            })
+    db.execute(models.Budget.__table__.insert(), budgets)
+    db.execute(models.Goal.__table__.insert(), goals)
+    db.commit()
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=100_000, help="total across all users")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--email-prefix", default="synthetic")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument(
+        "--end-date", type=date.fromisoformat, default=DEFAULT_END_DATE, help="last day of history (YYYY-MM-DD)"
+    )
+    args = parser.parse_args()
+
+    from app.config import settings
+    from app.database import SessionLocal, init_db
+
+    init_db()
+    emails = [f"{args.email_prefix}{index}@example.com" for index in range(args.users)]
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        generate(db, emails, args.transactions, args.seed, args.batch_size, args.end_date)
+    finally:
+        db.close()
+    print(
+        f"Generated {args.users} users and {args.transactions:,} transactions in "
+        f"{time.perf_counter() - started:.1f} s into {settings.DATABASE_URL}"
+    )
+    print(f"Log in as {emails[0]} with password {PASSWORD!r}")
+
+
+if __name__ == "__main__":
+    main()
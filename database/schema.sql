@@ -16,6 +16,7 @@ CREATE TABLE transactions (
     category TEXT NOT NULL,
     description TEXT,
     method TEXT DEFAULT 'cash',
+    currency TEXT,
     date DATE NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
@@ -43,6 +44,20 @@ CREATE TABLE goals (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+CREATE TABLE goal_contributions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    goal_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    transaction_id INTEGER,
+    amount REAL NOT NULL,
+    note TEXT,
+    contributed_on DATE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE
+);
+
 CREATE TABLE notifications (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id TEXT NOT NULL,
@@ -53,8 +68,33 @@ CREATE TABLE notifications (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+CREATE TABLE budget_spend (
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    period TEXT NOT NULL,
+    period_start DATE NOT NULL,
+    spent REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, category, period, period_start),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE exchange_rates (
+    currency TEXT NOT NULL,
+    rate_date DATE NOT NULL,
+    rate REAL NOT NULL,
+    PRIMARY KEY (currency, rate_date)
+);
+
+CREATE TABLE data_versions (
+    user_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
 CREATE INDEX idx_transactions_user_id ON transactions(user_id);
 CREATE INDEX idx_transactions_date ON transactions(date);
 CREATE INDEX idx_budgets_user_id ON budgets(user_id);
 CREATE INDEX idx_goals_user_id ON goals(user_id);
+CREATE INDEX idx_goal_contributions_goal_id ON goal_contributions(goal_id);
+CREATE INDEX idx_goal_contributions_user_id ON goal_contributions(user_id);
+CREATE INDEX idx_goal_contributions_transaction_id ON goal_contributions(transaction_id);
 CREATE INDEX idx_notifications_user_id ON notifications(user_id);
@@ -1,14 +1,26 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta, date
-from typing import Optional, Dict, List
+from typing import Any, Callable, Optional, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 import json
+import math
+from urllib.parse import urlencode
 from pathlib import Path
 
 API_BASE = "http://127.0.0.1:8000"
+# Seconds a GET response is reused across reruns; the user's own writes invalidate it sooner.
+GET_CACHE_TTL = 30
+HTTP_POOL_SIZE = 16
+TRANSACTION_PAGE_SIZES = [25, 50, 100, 250]
+# Charts ask the API to downsample series to about this many points.
+MAX_CHART_POINTS = 400
 THEME_COLORS = {
     "primary": "#2962FF", 
     "success": "#2ECC71", 
@@ -36,28 +48,122 @@ def initialize_session_state():
 initialize_session_state()
 
 
+@st.cache_resource
+def http_session() -> requests.Session:
+    """One keep-alive connection pool to the API, shared by every session and rerun."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def cache_generations() -> Dict[str, int]:
+    """Per-token counter bumped by writes, so a user's cached GETs are skipped after they change data."""
+    return {}
+
+
+def _auth_headers(token: Optional[str]) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+@st.cache_data(ttl=GET_CACHE_TTL, show_spinner=False)
+def cached_get(token: Optional[str], endpoint: str, generation: int):
+    response = http_session().get(f"{API_BASE}{endpoint}", headers=_auth_headers(token), timeout=10)
+    response.raise_for_status()
+    return response.json() if response.text else None
+
+
+@st.cache_data(ttl=GET_CACHE_TTL, max_entries=256, show_spinner=False)
+def cached_get_page(token: Optional[str], endpoint: str, generation: int) -> Tuple[List[Dict], int]:
+    """One page of a list endpoint and the ``X-Total-Count`` of all matching rows."""
+    response = http_session().get(f"{API_BASE}{endpoint}", headers=_auth_headers(token), timeout=10)
+    response.raise_for_status()
+    rows = response.json()
+    return rows, int(response.headers.get("X-Total-Count", len(rows)))
+
+
+def invalidate_cache(token: Optional[str]) -> None:
+    generations = cache_generations()
+    generations[token] = generations.get(token, 0) + 1
+
+
 def api_request(method: str, endpoint: str, data: Optional[Dict] = None, authenticated: bool = True) -> Optional[Dict]:
-    headers = {}
-    if authenticated and st.session_state.token:
-        headers["Authorization"] = f"Bearer {st.session_state.token}"
+    token = st.session_state.token if authenticated else None
     
     try:
-        url = f"{API_BASE}{endpoint}"
         if method == "GET":
-            response = requests.get(url, headers=headers, timeout=10)
-        elif method == "POST":
-            response = requests.post(url, json=data, headers=headers, timeout=10)
-        elif method == "PUT":
-            response = requests.put(url, json=data, headers=headers, timeout=10)
-        elif method == "DELETE":
-            response = requests.delete(url, headers=headers, timeout=10)
-        
+            return cached_get(token, endpoint, cache_generations().get(token, 0))
+
+        response = http_session().request(
+            method, f"{API_BASE}{endpoint}", json=data, headers=_auth_headers(token), timeout=10
+        )
+        invalidate_cache(token)
         response.raise_for_status()
         return response.json() if response.text else None
     except requests.exceptions.RequestException as e:
         st.error(f"API Error: {str(e)}")
         return None
 
+@st.cache_resource
+def fetch_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE, thread_name_prefix="api-fetch")
+
+
+def render_sections(sections: List[Tuple[Any, str, Callable[[Any], None]]]) -> None:
+    """Fetch every section's endpoint at once and render each one as soon as its data arrives.
+
+    ``sections`` holds (container, GET endpoint, render function). Each
+    container shows a loading placeholder until its response is in, so the
+    page takes as long as its slowest call rather than the sum of them.
+    """
+    token = st.session_state.token
+    generation = cache_generations().get(token, 0)
+    ctx = get_script_run_ctx()
+
+    def fetch(endpoint: str):
+        # st.cache_data needs the session's script context in the worker thread.
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return cached_get(token, endpoint, generation)
+
+    pending = {}
+    for container, endpoint, render in sections:
+        placeholder = container.empty()
+        placeholder.caption("Loading…")
+        pending[fetch_pool().submit(fetch, endpoint)] = (placeholder, render)
+
+    for future in as_completed(pending):
+        placeholder, render = pending[future]
+        try:
+            data = future.result()
+        except requests.exceptions.RequestException as e:
+            placeholder.error(f"API Error: {str(e)}")
+            continue
+        if not data:
+            placeholder.empty()
+            continue
+        with placeholder.container():
+            render(data)
+
+def api_page(endpoint: str) -> Tuple[List[Dict], int]:
+    token = st.session_state.token
+    try:
+        return cached_get_page(token, endpoint, cache_generations().get(token, 0))
+    except requests.exceptions.RequestException as e:
+        st.error(f"API Error: {str(e)}")
+        return [], 0
+
+def api_download(endpoint: str) -> Optional[bytes]:
+    headers = _auth_headers(st.session_state.token)
+    try:
+        with http_session().get(f"{API_BASE}{endpoint}", headers=headers, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            return b"".join(response.iter_content(chunk_size=64 * 1024))
+    except requests.exceptions.RequestException as e:
+        st.error(f"API Error: {str(e)}")
+        return None
+
 def login_page():
     col1, col2, col3 = st.columns([1, 2, 1])
     
@@ -77,7 +183,7 @@ def login_page():
                     st.error("Please fill in all fields")
                 else:
                     try:
-                        response = requests.post(
+                        response = http_session().post(
                             f"{API_BASE}/auth/login",
                             data={"username": email, "password": password},
                             timeout=10,
@@ -109,7 +215,7 @@ def login_page():
                     st.error("Passwords do not match")
                 else:
                     try:
-                        response = requests.post(
+                        response = http_session().post(
                             f"{API_BASE}/auth/signup",
                             json={
                                 "email": email,
@@ -127,13 +233,7 @@ def login_page():
                     except Exception as e:
                         st.error(f"Signup failed: {str(e)}")
 
-def dashboard_page():
-    st.title("📊 Dashboard")
-    
-    dashboard_data = api_request("GET", "/dashboard")
-    if not dashboard_data:
-        st.error("Failed to load dashboard data")
-        return
+def _render_summary(dashboard_data: Dict) -> None:
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("💵 Total Income", f"${dashboard_data['total_income']:.2f}")
@@ -144,48 +244,55 @@ def dashboard_page():
         st.metric("📈 Net Balance", f"${net:.2f}", delta=f"${net:.2f}")
     with col4:
         st.metric("📝 Transactions", dashboard_data["transaction_count"])
-    
-    st.markdown("---")
 
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Spending by Category")
-        categories = api_request("GET", "/reports/category")
-        if categories:
-            fig = go.Figure(data=[go.Pie(labels=list(categories.keys()), values=list(categories.values()))])
-            fig.update_traces(hoverinfo="label+percent+value", textposition="auto")
-            st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        st.subheader("Monthly Trend")
-        monthly = api_request("GET", "/reports/monthly")
-        if monthly:
-            df = pd.DataFrame([
-                {"Month": month, "Income": data["income"], "Expenses": data["expenses"]}
-                for month, data in monthly.items()
-            ])
-            fig = px.line(df, x="Month", y=["Income", "Expenses"], markers=True)
-            st.plotly_chart(fig, use_container_width=True)
-    
+
+def _render_category_pie(categories: Dict) -> None:
+    fig = go.Figure(data=[go.Pie(labels=list(categories.keys()), values=list(categories.values()))])
+    fig.update_traces(hoverinfo="label+percent+value", textposition="auto")
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _render_monthly_trend(monthly: Dict) -> None:
+    df = pd.DataFrame([
+        {"Month": month, "Income": data["income"], "Expenses": data["expenses"]}
+        for month, data in monthly.items()
+    ])
+    fig = px.line(df, x="Month", y=["Income", "Expenses"], markers=True)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _render_recent_transactions(transactions: List[Dict]) -> None:
+    df = pd.DataFrame(transactions)
+    st.dataframe(df[["date", "category", "type", "amount"]], use_container_width=True)
+
+
+def _render_goals(goals: Dict) -> None:
+    for goal_name, goal_data in goals.items():
+        st.write(f"**{goal_name}**")
+        st.progress(goal_data["percentage"] / 100)
+        st.write(f"${goal_data['current']:.2f} / ${goal_data['target']:.2f}")
+
+
+def dashboard_page():
+    st.title("📊 Dashboard")
+
+    summary = st.container()
     st.markdown("---")
-    
     col1, col2 = st.columns(2)
-    with col1:
-        st.subheader("📋 Recent Transactions")
-        transactions = api_request("GET", "/transactions/?limit=5")
-        if transactions:
-            df = pd.DataFrame(transactions)
-            st.dataframe(df[["date", "category", "type", "amount"]], use_container_width=True)
-    
-    with col2:
-        st.subheader("🎯 Goals Progress")
-        goals = api_request("GET", "/reports/goals")
-        if goals:
-            for goal_name, goal_data in goals.items():
-                st.write(f"**{goal_name}**")
-                st.progress(goal_data["percentage"] / 100)
-                st.write(f"${goal_data['current']:.2f} / ${goal_data['target']:.2f}")
+    col1.subheader("Spending by Category")
+    col2.subheader("Monthly Trend")
+    st.markdown("---")
+    col3, col4 = st.columns(2)
+    col3.subheader("📋 Recent Transactions")
+    col4.subheader("🎯 Goals Progress")
+
+    render_sections([
+        (summary, "/dashboard", _render_summary),
+        (col1, "/reports/category", _render_category_pie),
+        (col2, f"/reports/monthly?max_points={MAX_CHART_POINTS}", _render_monthly_trend),
+        (col3, "/transactions/?limit=5&fields=date,category,type,amount", _render_recent_transactions),
+        (col4, "/reports/goals", _render_goals),
+    ])
 
 def transactions_page():
     st.title("💳 Transactions")
@@ -193,28 +300,69 @@ def transactions_page():
     tab1, tab2 = st.tabs(["View Transactions", "Add Transaction"])
     
     with tab1:
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            category_filter = st.selectbox("Filter by Category", ["All", "Food", "Transport", "Entertainment", "Utilities", "Other"])
+            categories = api_request("GET", "/transactions/categories") or []
+            category_filter = st.selectbox("Filter by Category", ["All"] + categories)
         with col2:
             type_filter = st.selectbox("Filter by Type", ["All", "income", "expense"])
         with col3:
             sort_order = st.selectbox("Sort by Date", ["Newest First", "Oldest First"])
-        
-        transactions = api_request("GET", "/transactions/?limit=1000")
-        if transactions:
-            df = pd.DataFrame(transactions)
-            if category_filter != "All":
-                df = df[df["category"] == category_filter]
-            if type_filter != "All":
-                df = df[df["type"] == type_filter]
-
-            df = df.sort_values("date", ascending=(sort_order == "Oldest First"))
-            
+        with col4:
+            page_size = st.selectbox("Rows per page", TRANSACTION_PAGE_SIZES, index=1)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            date_range = st.date_input("Date range", value=(), format="YYYY-MM-DD")
+        with col2:
+            search = st.text_input("Search descriptions")
+
+        params = {
+            "category": None if category_filter == "All" else category_filter,
+            "type": None if type_filter == "All" else type_filter,
+            "start_date": date_range[0].isoformat() if len(date_range) > 0 else None,
+            "end_date": date_range[1].isoformat() if len(date_range) > 1 else None,
+            "search": search.strip() or None,
+        }
+        filter_query = urlencode({name: value for name, value in params.items() if value})
+        # Filters are applied by the server; changing them starts over at page 1.
+        if st.session_state.get("transaction_filters") != (filter_query, page_size):
+            st.session_state.transaction_filters = (filter_query, page_size)
+            st.session_state.transaction_page_number = 1
+
+        order = "oldest" if sort_order == "Oldest First" else "newest"
+        page_number = st.session_state.get("transaction_page_number", 1)
+        fields = "date,category,type,amount,description"
+
+        def fetch_page(number: int) -> Tuple[List[Dict], int]:
+            skip = (number - 1) * page_size
+            paging = urlencode({"order": order, "skip": skip, "limit": page_size, "fields": fields})
+            return api_page(f"/transactions/?{filter_query}&{paging}" if filter_query else f"/transactions/?{paging}")
+
+        rows, total = fetch_page(page_number)
+        pages = max(1, math.ceil(total / page_size))
+        if page_number > pages:
+            page_number = st.session_state.transaction_page_number = pages
+            rows, total = fetch_page(page_number)
+        # Only the visible page is kept between reruns.
+        st.session_state.transaction_rows = rows
+
+        if rows:
             st.dataframe(
-                df[["date", "category", "type", "amount", "description"]],
+                pd.DataFrame(rows, columns=fields.split(",")),
                 use_container_width=True,
+                hide_index=True,
             )
+        else:
+            st.info("No transactions match these filters.")
+
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            st.number_input("Page", min_value=1, max_value=pages, step=1, key="transaction_page_number")
+        with col2:
+            if rows:
+                first = (page_number - 1) * page_size + 1
+                st.caption(f"Rows {first:,}–{first + len(rows) - 1:,} of {total:,} (page {page_number} of {pages})")
     
     with tab2:
         st.subheader("Add New Transaction")
@@ -325,6 +473,35 @@ def goals_page():
                 st.success("Goal created!")
                 st.rerun()
 
+def _render_category_bars(categories: Dict) -> None:
+    fig = px.bar(
+        x=list(categories.keys()),
+        y=list(categories.values()),
+        labels={"x": "Category", "y": "Amount ($)"},
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _render_monthly_cashflow(monthly: Dict) -> None:
+    df = pd.DataFrame([
+        {"Month": month, "Income": data["income"], "Expenses": data["expenses"], "Net": data["income"] - data["expenses"]}
+        for month, data in monthly.items()
+    ])
+    fig = px.line(df, x="Month", y=["Income", "Expenses", "Net"], markers=True)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _render_daily_balance(series: Dict) -> None:
+    if not series["dates"]:
+        st.info("No transactions yet.")
+        return
+    df = pd.DataFrame({"Date": series["dates"], "Balance": series["balance"]})
+    fig = px.line(df, x="Date", y="Balance")
+    st.plotly_chart(fig, use_container_width=True)
+    if series["total_points"] > len(series["dates"]):
+        st.caption(f"{len(series['dates']):,} of {series['total_points']:,} days shown, keeping the curve's shape.")
+
+
 def reports_page():
     st.title("📈 Reports")
     
@@ -332,52 +509,40 @@ def reports_page():
     
     with tab1:
         col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Category Breakdown")
-            categories = api_request("GET", "/reports/category")
-            if categories:
-                fig = px.bar(
-                    x=list(categories.keys()),
-                    y=list(categories.values()),
-                    labels={"x": "Category", "y": "Amount ($)"},
-                )
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            st.subheader("Monthly Cashflow")
-            monthly = api_request("GET", "/reports/monthly")
-            if monthly:
-                df = pd.DataFrame([
-                    {"Month": month, "Income": data["income"], "Expenses": data["expenses"], "Net": data["income"] - data["expenses"]}
-                    for month, data in monthly.items()
-                ])
-                fig = px.line(df, x="Month", y=["Income", "Expenses", "Net"], markers=True)
-                st.plotly_chart(fig, use_container_width=True)
+        col1.subheader("Category Breakdown")
+        col2.subheader("Monthly Cashflow")
+        st.subheader("Daily Balance")
+        balance = st.container()
+        render_sections([
+            (col1, "/reports/category", _render_category_bars),
+            (col2, f"/reports/monthly?max_points={MAX_CHART_POINTS}", _render_monthly_cashflow),
+            (balance, f"/reports/timeseries?max_points={MAX_CHART_POINTS}", _render_daily_balance),
+        ])
     
     with tab2:
         st.subheader("Export Data")
-        transactions = api_request("GET", "/transactions/?limit=10000")
-        if transactions:
-            df = pd.DataFrame(transactions)
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name=f"transactions_{date.today()}.csv",
-                    mime="text/csv",
-                )
-            
-            with col2:
-                json_data = df.to_json(orient="records")
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.selectbox("Format", ["csv", "ndjson", "parquet"])
+        with col2:
+            compress = st.checkbox("Gzip compress")
+            only_filtered = st.checkbox(
+                "Only transactions matching the Transactions page filters",
+                disabled=not st.session_state.get("transaction_filters", ("",))[0],
+            )
+
+        if st.button("Prepare Export", use_container_width=True):
+            query = f"format={export_format}&gzip={str(compress).lower()}"
+            if only_filtered:
+                query += f"&{st.session_state.transaction_filters[0]}"
+            content = api_download(f"/transactions/export?{query}")
+            if content is not None:
+                extension = f"{export_format}.gz" if compress else export_format
                 st.download_button(
-                    label="Download JSON",
-                    data=json_data,
-                    file_name=f"transactions_{date.today()}.json",
-                    mime="application/json",
+                    label=f"Download {extension.upper()}",
+                    data=content,
+                    file_name=f"transactions_{date.today()}.{extension}",
+                    mime="application/gzip" if compress else "application/octet-stream",
                 )
 
 def settings_page():
@@ -389,6 +554,7 @@ def settings_page():
         st.subheader("Profile")
         st.write(f"**Email:** {st.session_state.user}")
         if st.button("Logout", use_container_width=True):
+            cache_generations().pop(st.session_state.token, None)
             st.session_state.token = None
             st.session_state.user = None
             st.success("Logged out!")
@@ -0,0 +1,51 @@
+from benchmarks.hot_paths import compare
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    """Test that the hot-path benchmark fails only on slowdowns beyond both limits."""
+    baseline = {
+        "reports[1000]": {"median_ms": 10.0},
+        "paging[1000]": {"median_ms": 10.0},
+        "tiny[1000]": {"median_ms": 0.1},
+    }
+    results = {
+        "reports[1000]": {"median_ms": 14.0},
+        "paging[1000]": {"median_ms": 12.0},
+        "tiny[1000]": {"median_ms": 0.5},
+        "new[1000]": {"median_ms": 99.0},
+    }
+    regressions = compare(results, baseline, threshold=0.25, min_delta_ms=1.0)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("reports[1000]: 10.00 ms -> 14.00 ms")
+
+
+def test_synthetic_ledgers_are_reproducible():
+    """Test that the same seed generates identical rows on any day."""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app import models
+    from benchmarks.synthetic import generate
+
+    # The password hash is salted, so it is the one column left out.
+    queries = {
+        "users": "SELECT id, email, full_name, created_at FROM users ORDER BY id",
+        "transactions": "SELECT * FROM transactions ORDER BY id",
+        "budgets": "SELECT * FROM budgets ORDER BY id",
+        "goals": "SELECT * FROM goals ORDER BY id",
+    }
+
+    def rows():
+        engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+        models.Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            generate(db, ["a@example.com", "b@example.com"], 500, seed=7)
+            return {table: db.execute(text(query)).all() for table, query in queries.items()}
+        finally:
+            db.close()
+
+    first = rows()
+    assert len(first["transactions"]) == 500
+    assert first == rows()
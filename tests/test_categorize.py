@@ -0,0 +1,24 @@
+from app.services.categorize import Categorizer, tokens
+
+
+def test_exact_keyword_and_model_suggestions():
+    """Test that each lookup stage answers when the cheaper ones cannot."""
+    categorizer = Categorizer([
+        ("STARBUCKS STORE 0412", "Food", 30),
+        ("UBER TRIP", "Transport", 20),
+        ("UBER EATS", "Food", 15),
+        ("Whole Foods Market", "Groceries", 9),
+        ("Old payee", "Uncategorized", 50),
+    ])
+    assert tokens("POS PURCHASE Starbucks Store #7781") == ("starbucks", "store")
+
+    exact, keyword, model, unknown, empty = categorizer.suggest([
+        "POS Starbucks Store 9999", "UBER EATS ORDER 12", "fresh foods market", "old payee", None,
+    ])
+    assert (exact.category, exact.source) == ("Food", "exact")
+    assert (keyword.category, keyword.source) == ("Food", "keyword")
+    assert (model.category, model.source) == ("Groceries", "model")
+    assert unknown.category is None and empty.category is None
+
+    rows = [{"description": "Uber trip home", "category": None}, {"description": "?", "category": "Gifts"}]
+    assert [row["category"] for row in categorizer.fill(rows, batch_size=1)] == ["Transport", "Gifts"]
@@ -0,0 +1,19 @@
+import math
+
+from app.services.downsample import lttb, min_max, select
+
+
+def test_downsampling_keeps_endpoints_budget_and_spikes():
+    """Test that both methods stay within budget, keep the ends and keep a lone spike."""
+    x = list(range(10_000))
+    y = [math.sin(i / 500) for i in x]
+    y[4321] = 25.0
+
+    for indices in (lttb(x, y, 200), min_max(y, 200)):
+        assert len(indices) <= 200
+        assert indices[0] == 0 and indices[-1] == len(x) - 1
+        assert indices == sorted(set(indices))
+        assert 4321 in indices
+
+    assert lttb(x[:50], y[:50], 100) == list(range(50))
+    assert len(select(x, [y, [-value for value in y]], 300)) <= 300
@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.fx import ExchangeRateService, fallback_rates
+
+
+@pytest.fixture
+def rate_server():
+    """Local stand-in for the upstream API that counts requests."""
+    state = {"hits": 0, "delay": 0.0, "eur": 0.9}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["hits"] += 1
+            time.sleep(state["delay"])
+            base = self.path.rsplit("/", 1)[-1]
+            body = json.dumps({"base": base, "rates": {base: 1.0, "EUR": state["eur"]}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}/latest/{{base}}"
+    yield state
+    server.shutdown()
+
+
+def test_rates_are_cached_and_fetched_once_for_concurrent_callers(rate_server, tmp_path):
+    """Test that concurrent cold lookups share one upstream request and later ones hit the cache."""
+    rate_server["delay"] = 0.2
+    service = ExchangeRateService(rate_server["url"], ttl=60, cache_path=str(tmp_path / "fx.json"))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get_rates("usd"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [{"USD": 1.0, "EUR": 0.9}] * 8
+    assert service.get_rates("USD")["EUR"] == 0.9
+    assert rate_server["hits"] == 1
+
+    restarted = ExchangeRateService(rate_server["url"], ttl=60, cache_path=str(tmp_path / "fx.json"))
+    assert restarted.get_rates("USD")["EUR"] == 0.9
+    assert rate_server["hits"] == 1
+
+
+def test_expired_rates_are_served_while_refreshing(rate_server, tmp_path):
+    """Test stale-while-revalidate: the old rates answer at once and a refresh replaces them."""
+    service = ExchangeRateService(rate_server["url"], ttl=0, cache_path=str(tmp_path / "fx.json"))
+    assert service.get_rates("USD")["EUR"] == 0.9
+    rate_server["eur"] = 0.95
+    assert service.get_rates("USD")["EUR"] == 0.9
+    deadline = time.time() + 5
+    while service._cache["USD"][1]["EUR"] != 0.95 and time.time() < deadline:
+        time.sleep(0.01)
+    assert service.get_rates("USD")["EUR"] == 0.95
+
+
+def test_unreachable_upstream_uses_fallback_rates(tmp_path):
+    """Test that a failing upstream with no cached rates falls back to the built-in table."""
+    service = ExchangeRateService("http://127.0.0.1:9/latest/{base}", timeout=1, cache_path=str(tmp_path / "fx.json"))
+    assert service.get_rates("EUR") == fallback_rates("EUR")
+    assert service.get_rates("EUR")["EUR"] == 1.0
+
+
+def test_convert_rejects_unknown_target_currency(rate_server, tmp_path):
+    """Test that converting into a currency without a rate fails with a clear ValueError."""
+    service = ExchangeRateService(rate_server["url"], ttl=60, cache_path=str(tmp_path / "fx.json"))
+    assert service.convert(10.0, "usd", "EUR") == pytest.approx(9.0)
+    with pytest.raises(ValueError, match="USD to XYZ"):
+        service.convert(10.0, "USD", "XYZ")
@@ -1,19 +1,30 @@
+import asyncio
+import gzip
+import io
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from datetime import date, timedelta
 
 from app.main import app, get_db
 from app.database import Base
 from app.utils.security import get_password_hash, verify_password
 from app import crud, schemas
+from app.config import settings
+from app.services.events import bus
+from app.services.profiler import store as profile_store
+from app import models
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
 )
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -192,6 +203,39 @@ def test_list_transactions(test_user_data):
     assert len(data) >= 1
 
 
+def test_list_transactions_filters_and_total_count():
+    """Test server-side filters, ordering, paging and the X-Total-Count header."""
+    headers = _auth_headers("filters@example.com")
+    today = date.today()
+    for offset, (category, kind, description) in enumerate([
+        ("Food", "expense", "Corner cafe"), ("Food", "expense", "100% organic"),
+        ("Salary", "income", "Payroll"), ("Transport", "expense", "Cafe shuttle"),
+    ]):
+        client.post("/transactions/", json={
+            "amount": 10.0 + offset, "type": kind, "category": category,
+            "description": description, "date": str(today - timedelta(days=offset)),
+        }, headers=headers)
+
+    response = client.get("/transactions/?type=expense&limit=2", headers=headers)
+    assert response.headers["x-total-count"] == "3"
+    assert [row["amount"] for row in response.json()] == [10.0, 11.0]
+
+    response = client.get("/transactions/?type=expense&limit=2&skip=1&order=oldest", headers=headers)
+    assert [row["amount"] for row in response.json()] == [11.0, 10.0]
+
+    response = client.get("/transactions/?search=CAFE&fields=category", headers=headers)
+    assert response.headers["x-total-count"] == "2"
+    assert sorted(row["category"] for row in response.json()) == ["Food", "Transport"]
+
+    response = client.get("/transactions/?search=%25", headers=headers)
+    assert [row["description"] for row in response.json()] == ["100% organic"]
+
+    start = str(today - timedelta(days=2))
+    response = client.get(f"/transactions/?category=Food&start_date={start}&end_date={today}", headers=headers)
+    assert response.headers["x-total-count"] == "2"
+    assert client.get("/transactions/categories", headers=headers).json() == ["Food", "Salary", "Transport"]
+
+
 def test_update_transaction(test_user_data):
     """Test updating a transaction."""
     # Signup, login, and create transaction
@@ -361,6 +405,32 @@ def test_get_monthly_report(test_user_data):
     assert response.status_code == 200
 
 
+def test_reports_downsample_long_histories():
+    """Test max_points on the monthly report and the daily time series."""
+    headers = _auth_headers("downsample@example.com")
+    start = date.today() - timedelta(days=400)
+    for offset in range(0, 400, 4):
+        client.post("/transactions/", json={
+            "amount": 5.0 + offset % 7, "type": "expense" if offset % 8 else "income",
+            "category": "Food", "date": str(start + timedelta(days=offset)),
+        }, headers=headers)
+
+    full = client.get("/reports/timeseries", headers=headers).json()
+    assert full["total_points"] == len(full["dates"]) == 100
+    assert full["balance"][-1] == sum(full["income"]) - sum(full["expenses"])
+
+    reduced = client.get("/reports/timeseries?max_points=30&method=minmax", headers=headers).json()
+    assert reduced["total_points"] == 100
+    assert len(reduced["dates"]) <= 30
+    assert reduced["dates"][0] == full["dates"][0] and reduced["balance"][-1] == full["balance"][-1]
+
+    months = client.get("/reports/monthly", headers=headers).json()
+    reduced_months = client.get("/reports/monthly?max_points=10", headers=headers).json()
+    assert len(reduced_months) <= 10 < len(months)
+    assert list(reduced_months)[0] == list(months)[0]
+    assert client.get("/reports/monthly?max_points=2", headers=headers).status_code == 422
+
+
 def test_get_category_report(test_user_data):
     """Test getting category breakdown report."""
     client.post("/auth/signup", json=test_user_data)
@@ -373,3 +443,762 @@ def test_get_category_report(test_user_data):
     
     response = client.get("/reports/category", headers=headers)
     assert response.status_code == 200
+
+
+def _auth_headers(email):
+    """Sign up and log in a dedicated user so counts are not shared between tests."""
+    password = "testpassword123"
+    client.post("/auth/signup", json={"email": email, "full_name": "Test User", "password": password})
+    login_response = client.post("/auth/login", data={"username": email, "password": password})
+    return {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+# ============= Conditional Request Tests =============
+
+
+def test_budgets_etag_not_modified():
+    """Test that an unchanged budget list answers 304 for a matching ETag."""
+    headers = _auth_headers("etag@example.com")
+
+    response = client.get("/budgets/", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get("/budgets/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_etag_changes_after_write():
+    """Test that crud writes invalidate the ETag of report endpoints."""
+    headers = _auth_headers("etag-write@example.com")
+
+    etag = client.get("/reports/category", headers=headers).headers["etag"]
+    client.post(
+        "/transactions/",
+        json={"amount": 12.0, "type": "expense", "category": "Food", "date": str(date.today())},
+        headers=headers,
+    )
+
+    response = client.get("/reports/category", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json() == {"Food": 12.0}
+
+
+# ============= Export Tests =============
+
+
+def test_export_transactions_csv_and_ndjson():
+    """Test streaming exports in CSV, NDJSON and gzipped CSV."""
+    headers = _auth_headers("export@example.com")
+    for amount in (10.0, 20.0, 30.0):
+        client.post(
+            "/transactions/",
+            json={"amount": amount, "type": "expense", "category": "Food", "date": str(date.today())},
+            headers=headers,
+        )
+
+    response = client.get("/transactions/export?format=csv", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("id,date,type,category,amount,currency")
+    assert lines[1].split(",")[5] == "USD"
+    assert len(lines) == 4
+
+    response = client.get("/transactions/export?format=ndjson", headers=headers)
+    rows = [json.loads(line) for line in response.text.strip().splitlines()]
+    assert sorted(row["amount"] for row in rows) == [10.0, 20.0, 30.0]
+
+    response = client.get("/transactions/export?format=csv&gzip=true", headers=headers)
+    assert response.headers["content-type"] == "application/gzip"
+    assert gzip.decompress(response.content).decode().count("\n") == 4
+
+
+def test_import_statement_csv_and_html():
+    """Test importing bank statements: outflows become expenses and budgets see them."""
+    headers = _auth_headers("import@example.com")
+    client.post("/budgets/", json={"category": "Groceries", "limit_amount": 100.0, "period": "monthly"}, headers=headers)
+    today = date.today()
+    statement = (
+        "Date;Description;Debit;Credit\n"
+        f"{today:%d.%m.%Y};Supermarkt;1.234,50;\n"
+        f"{today:%d.%m.%Y};Gehalt;;2.500,00\n"
+        "Summe;;1.234,50;2.500,00\n"
+    )
+    response = client.post(
+        "/transactions/import?locale=de&category=Groceries",
+        files={"file": ("statement.csv", statement.encode(), "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    assert response.json() == {"imported": 2, "format": "csv"}
+    rows = client.get("/transactions/", headers=headers).json()
+    assert sorted((row["type"], row["amount"]) for row in rows) == [("expense", 1234.5), ("income", 2500.0)]
+    notifications = client.get("/notifications/", headers=headers).json()
+    assert [n["title"] for n in notifications] == ["Budget exceeded: Groceries"]
+
+    html = (
+        "<table><tr><th>Date</th><th>Description</th><th>Amount</th></tr>"
+        f"<tr><td>{today}</td><td>Coffee</td><td>($4.50)</td></tr></table>"
+    )
+    response = client.post(
+        "/transactions/import", files={"file": ("statement.html", html.encode(), "text/html")}, headers=headers
+    )
+    assert response.json() == {"imported": 1, "format": "html"}
+
+    response = client.post(
+        "/transactions/import", files={"file": ("statement", b"", "application/octet-stream")}, headers=headers
+    )
+    assert response.status_code == 400
+
+
+def test_categories_are_suggested_and_filled_on_import():
+    """Test category suggestions from history, their cache, and categorized imports."""
+    headers = _auth_headers("categorize@example.com")
+    for description, category in [("SHELL OIL 5531", "Transport"), ("Shell Oil 0042", "Transport"),
+                                  ("NETFLIX.COM", "Subscriptions"), ("Corner Bakery", "Food")]:
+        client.post("/transactions/", json={
+            "amount": 9.99, "type": "expense", "category": category,
+            "description": description, "date": str(date.today()),
+        }, headers=headers)
+
+    response = client.post(
+        "/transactions/categorize", json={"descriptions": ["Shell Oil 9", "netflix.com", "Mystery"]}, headers=headers
+    )
+    assert response.status_code == 200
+    assert [(item["category"], item["source"]) for item in response.json()] == [
+        ("Transport", "exact"), ("Subscriptions", "exact"), (None, None),
+    ]
+
+    statement = f"Date,Description,Amount\n{date.today()},SHELL OIL 7781,-40.00\n{date.today()},Mystery,-1.00\n"
+    response = client.post(
+        "/transactions/import", files={"file": ("statement.csv", statement.encode(), "text/csv")}, headers=headers
+    )
+    assert response.json()["imported"] == 2
+    categories = client.get("/transactions/?search=7781", headers=headers).json()
+    assert [row["category"] for row in categories] == ["Transport"]
+    mystery = client.get("/transactions/?search=Mystery", headers=headers).json()
+    assert [row["category"] for row in mystery] == ["Uncategorized"]
+
+
+def test_export_transactions_parquet():
+    """Test that the Parquet export reads back with every row."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    headers = _auth_headers("export-parquet@example.com")
+    client.post(
+        "/transactions/",
+        json={"amount": 42.0, "type": "income", "category": "Salary", "date": str(date.today())},
+        headers=headers,
+    )
+
+    response = client.get("/transactions/export?format=parquet", headers=headers)
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("amount").to_pylist() == [42.0]
+    assert table.column("currency").to_pylist() == ["USD"]
+
+
+# ============= Compression Tests =============
+
+
+def test_large_responses_are_gzipped():
+    """Test that list payloads above the size threshold are gzip encoded."""
+    headers = _auth_headers("compress@example.com")
+    for _ in range(20):
+        client.post(
+            "/transactions/",
+            json={"amount": 5.0, "type": "expense", "category": "Food", "date": str(date.today())},
+            headers=headers,
+        )
+
+    response = client.get("/transactions/", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 20
+
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_streaming_responses_are_compressed():
+    """Test that streamed exports are gzip encoded without a Content-Length."""
+    headers = _auth_headers("compress-stream@example.com")
+    client.post(
+        "/transactions/",
+        json={"amount": 5.0, "type": "expense", "category": "Food", "date": str(date.today())},
+        headers=headers,
+    )
+
+    with client.stream(
+        "GET", "/transactions/export?format=ndjson", headers={**headers, "Accept-Encoding": "gzip"}
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    assert json.loads(gzip.decompress(raw))["amount"] == 5.0
+
+
+def test_encoding_negotiation_respects_q_values():
+    """Test that the client's q-values pick the encoding and server preference only breaks ties."""
+    from app.middleware.compression import negotiate_encoding
+
+    preference = ["zstd", "br", "gzip"]
+    assert negotiate_encoding("br;q=0.1, gzip;q=1", preference) == "gzip"
+    assert negotiate_encoding("gzip, br", preference) == "br"
+    assert negotiate_encoding("*;q=0.5, zstd;q=0", preference) == "br"
+    assert negotiate_encoding("gzip;q=0", preference) is None
+
+
+def test_event_streams_are_not_compressed():
+    """Test that server-sent events pass through the compression middleware untouched."""
+    from fastapi.responses import StreamingResponse
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+
+    from app.middleware.compression import CompressionMiddleware
+
+    async def events(request):
+        async def stream():
+            for index in range(3):
+                yield f"data: {index}\n\n" * 200
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    stream_app = CompressionMiddleware(Starlette(routes=[Route("/events", events)]), minimum_size=1)
+    with TestClient(stream_app).stream("GET", "/events", headers={"Accept-Encoding": "gzip"}) as response:
+        assert "content-encoding" not in response.headers
+        assert b"".join(response.iter_raw()).startswith(b"data: 0")
+
+
+# ============= Batch Tests =============
+
+
+def test_batch_dashboard_requests():
+    """Test that one batch call returns every dashboard widget."""
+    headers = _auth_headers("batch@example.com")
+    client.post(
+        "/transactions/",
+        json={"amount": 80.0, "type": "expense", "category": "Food", "date": str(date.today())},
+        headers=headers,
+    )
+
+    paths = [
+        "/dashboard",
+        "/reports/category",
+        "/reports/monthly",
+        "/transactions/?limit=5&fields=date,category,type,amount",
+        "/reports/goals",
+    ]
+    response = client.post(
+        "/batch",
+        json={"requests": [{"id": str(i), "path": path} for i, path in enumerate(paths)]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    results = response.json()["responses"]
+    assert [r["status"] for r in results] == [200] * len(paths)
+    assert results[0]["body"]["total_expenses"] == 80.0
+    assert results[1]["body"] == {"Food": 80.0}
+    assert results[3]["body"] == [{"date": str(date.today()), "category": "Food", "type": "expense", "amount": 80.0}]
+
+
+def test_batch_rejects_unknown_paths_and_bad_params():
+    """Test per-operation errors do not fail the whole batch."""
+    headers = _auth_headers("batch-errors@example.com")
+    response = client.post(
+        "/batch",
+        json={"requests": [{"path": "/auth/login"}, {"path": "/transactions/?limit=0"}, {"path": "/budgets/"}]},
+        headers=headers,
+    )
+    assert [r["status"] for r in response.json()["responses"]] == [404, 422, 200]
+
+
+def test_batch_transactions_apply_list_filters():
+    """Test that batched transaction lists honour the list filters and reject unknown ones."""
+    headers = _auth_headers("batch-filters@example.com")
+    for category in ("Food", "Rent"):
+        client.post("/transactions/", json={
+            "amount": 5.0, "type": "expense", "category": category, "date": str(date.today()),
+        }, headers=headers)
+    response = client.post("/batch", json={"requests": [
+        {"path": "/transactions/?category=Food&order=oldest"},
+        {"path": "/transactions/?type=transfer"},
+        {"path": "/transactions/?colour=red"},
+    ]}, headers=headers)
+    food, bad_type, unknown = response.json()["responses"]
+    assert food["status"] == 200 and [row["category"] for row in food["body"]] == ["Food"]
+    assert bad_type["status"] == 422
+    assert unknown["status"] == 400
+
+
+def test_batch_report_series_match_the_query_endpoints():
+    """Test that batched monthly and daily series honour max_points and method like the GET endpoints."""
+    headers = _auth_headers("batch-series@example.com")
+    start = date.today() - timedelta(days=60)
+    for offset in range(40):
+        client.post("/transactions/", json={
+            "amount": 5.0 + offset, "type": "expense", "category": "Food", "date": str(start + timedelta(days=offset)),
+        }, headers=headers)
+    query = "max_points=10&method=minmax"
+    response = client.post("/batch", json={"requests": [
+        {"path": f"/reports/timeseries?{query}"},
+        {"path": f"/reports/monthly?{query}"},
+        {"path": "/reports/timeseries?max_points=5"},
+        {"path": "/reports/monthly?method=mean"},
+        {"path": "/reports/monthly?months=3"},
+    ]}, headers=headers)
+    daily, monthly, too_few, bad_method, unknown = response.json()["responses"]
+    assert daily["status"] == 200 and len(daily["body"]["dates"]) < 40
+    assert daily["body"] == client.get(f"/reports/timeseries?{query}", headers=headers).json()
+    assert monthly["body"] == client.get(f"/reports/monthly?{query}", headers=headers).json()
+    assert [too_few["status"], bad_method["status"], unknown["status"]] == [422, 422, 400]
+
+
+# ============= Sparse Fieldset Tests =============
+
+
+def test_list_transactions_sparse_fields():
+    """Test that fields= narrows the serialized transaction rows."""
+    headers = _auth_headers("sparse@example.com")
+    client.post(
+        "/transactions/",
+        json={"amount": 9.5, "type": "expense", "category": "Food", "date": str(date.today()), "description": "x" * 400},
+        headers=headers,
+    )
+
+    response = client.get("/transactions/?limit=5&fields=date,category,type,amount", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [{"date": str(date.today()), "category": "Food", "type": "expense", "amount": 9.5}]
+
+    response = client.get("/transactions/?fields=amount,hashed_password", headers=headers)
+    assert response.status_code == 400
+
+
+def test_list_budgets_sparse_fields_keeps_etag():
+    """Test sparse budget lists still carry the conditional-request ETag."""
+    headers = _auth_headers("sparse-budgets@example.com")
+    client.post("/budgets/", json={"category": "Food", "limit_amount": 300.0}, headers=headers)
+
+    response = client.get("/budgets/?fields=category,limit_amount", headers=headers)
+    assert response.json() == [{"category": "Food", "limit_amount": 300.0}]
+    assert "etag" in response.headers
+
+
+# ============= Live Event Tests =============
+
+
+def test_transaction_writes_publish_live_deltas():
+    """Test crud writes push transaction and budget-threshold deltas to subscribers."""
+    headers = _auth_headers("live@example.com")
+    db = TestingSessionLocal()
+    user_id = crud.get_user_by_email(db, "live@example.com").id
+    db.close()
+    client.post("/budgets/", json={"category": "Food", "limit_amount": 100.0}, headers=headers)
+    # Last year's spending is outside the budget's current period.
+    client.post("/transactions/", json={
+        "amount": 500.0, "type": "expense", "category": "Food", "date": str(date.today() - timedelta(days=400)),
+    }, headers=headers)
+
+    async def scenario():
+        subscription = bus.subscribe(user_id)
+        try:
+            await asyncio.to_thread(
+                client.post,
+                "/transactions/",
+                json={"amount": 85.0, "type": "expense", "category": "Food", "date": str(date.today())},
+                headers=headers,
+            )
+            created = await asyncio.wait_for(subscription.get(), 2)
+            progress = await asyncio.wait_for(subscription.get(), 2)
+        finally:
+            bus.unsubscribe(subscription)
+        return created, progress
+
+    created, progress = asyncio.run(scenario())
+    assert created["event"] == "transaction.created"
+    assert created["data"]["amount"] == 85.0
+    assert progress["event"] == "budget.progress"
+    assert progress["data"]["spent"] == 85.0
+    assert progress["data"]["period"] == "monthly"
+    assert progress["data"]["threshold_crossed"] == 80.0
+    assert not bus.has_subscribers(user_id)
+
+
+# ============= Metrics Tests =============
+
+
+def test_metrics_endpoint_reports_route_histograms():
+    """Test that /metrics exposes per-route counts, latency buckets and cache results."""
+    headers = _auth_headers("metrics@example.com")
+    client.get("/budgets/", headers=headers)
+    client.get("/budgets/does-not-exist", headers=headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/budgets/",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/budgets/",le="+Inf"}' in body
+    assert 'route="/budgets/{budget_id}",status="422"' in body
+    assert 'cache_requests_total{cache="etag",result="miss"}' in body
+    assert "http_requests_in_flight 0" in body
+
+
+# ============= Query Instrumentation Tests =============
+
+
+def test_debug_headers_report_query_count_and_n_plus_one(monkeypatch):
+    """Test per-request query counting and N+1 detection exposed in debug headers."""
+    headers = _auth_headers("queries@example.com")
+    response = client.get("/budgets/", headers=headers)
+    assert int(response.headers["x-db-query-count"]) >= 2
+    assert float(response.headers["x-db-time-ms"]) >= 0
+    assert response.headers["x-db-n-plus-one"] == "0"
+
+    monkeypatch.setattr(settings, "N_PLUS_ONE_THRESHOLD", 2)
+    response = client.post(
+        "/batch",
+        json={"requests": [{"path": "/budgets/"}, {"path": "/budgets/"}, {"path": "/budgets/"}]},
+        headers=headers,
+    )
+    assert response.headers["x-db-n-plus-one"] == "1"
+
+
+def test_slow_queries_are_logged_with_plan(monkeypatch, caplog):
+    """Test that statements over SLOW_QUERY_MS are logged with their query plan."""
+    headers = _auth_headers("slow-queries@example.com")
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+    with caplog.at_level("WARNING", logger="app.services.query_stats"):
+        client.get("/goals/", headers=headers)
+    assert any("Slow query" in record.message and "Plan:" in record.message for record in caplog.records)
+
+
+# ============= Profiler Tests =============
+
+
+def test_admin_can_profile_a_request(monkeypatch, tmp_path):
+    """Test that an admin's X-Profile request stores a profile readable from /admin/profiles."""
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+    headers = _auth_headers("profiler-admin@example.com")
+    db = TestingSessionLocal()
+    db.query(models.User).filter(models.User.email == "profiler-admin@example.com").update({"role": "admin"})
+    db.commit()
+    db.close()
+
+    response = client.get("/reports/summary", headers={**headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    listing = client.get("/admin/profiles", headers=headers)
+    assert listing.status_code == 200
+    assert listing.json()[0]["id"] == profile_id
+    assert listing.json()[0]["request"] == "GET /reports/summary"
+
+    profile = client.get(f"/admin/profiles/{profile_id}", headers=headers)
+    assert profile.status_code == 200
+    assert profile.text.startswith("# GET /reports/summary")
+    assert client.get("/admin/profiles/missing", headers=headers).status_code == 404
+
+
+def test_profiling_requires_admin(monkeypatch, tmp_path):
+    """Test that non-admins can neither trigger profiles nor read them."""
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+    headers = _auth_headers("profiler-user@example.com")
+    response = client.get("/budgets/?profile=1", headers=headers)
+    assert response.status_code == 403
+    assert client.get("/admin/profiles", headers=headers).status_code == 403
+    assert profile_store.list() == []
+
+    for path in ("/budgets/", "/budgets/?profile=10", "/budgets/?noprofile=1"):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+
+
+def _request_rows(done):
+    done.wait()
+    yield from ()
+
+
+def _other_rows(done):
+    done.wait()
+    yield from ()
+
+
+def test_profiler_samples_only_the_request_threads():
+    """Test that the sampler skips workers busy with other requests."""
+    import threading
+
+    import anyio
+    from app.services.categorize import Categorizer
+    from app.services.profiler import StackSampler, active_sampler
+
+    done = threading.Event()
+    sampler = StackSampler(0.001)
+
+    async def request():
+        active_sampler.set(sampler)
+        sampler.start()
+        await anyio.to_thread.run_sync(lambda: list(Categorizer([]).fill(_request_rows(done))))
+
+    other = threading.Thread(target=lambda: list(Categorizer([]).fill(_other_rows(done))))
+    other.start()
+    threading.Timer(0.1, done.set).start()
+    anyio.run(request)
+    other.join()
+    samples = sampler.stop()
+
+    assert any("_request_rows" in stack for stack in samples)
+    assert not any("_other_rows" in stack for stack in samples)
+
+
+# ============= Multi-worker Tests =============
+
+
+def test_database_data_versions_are_shared_between_stores():
+    """Test that two stores on one database (as in two workers) see each other's bumps."""
+    from app.services.versioning import DatabaseDataVersionStore
+
+    first, second = DatabaseDataVersionStore(engine), DatabaseDataVersionStore(engine)
+    assert first.get("worker-user") == 0
+    assert first.bump("worker-user") == 1
+    assert second.bump("worker-user") == 2
+    assert first.get("worker-user") == 2
+    assert first.epoch == second.epoch
+
+
+# ============= Notification Tests =============
+
+
+def test_budget_thresholds_create_notifications():
+    """Test 80%/100% crossings in the current period notify once each, newest first."""
+    headers = _auth_headers("alerts@example.com")
+    today = date.today().isoformat()
+    client.post("/budgets/", json={"category": "Food", "limit_amount": 100.0, "period": "monthly"}, headers=headers)
+    expense = {"type": "expense", "category": "Food", "date": today}
+
+    client.post("/transactions/", json={**expense, "amount": 50.0}, headers=headers)
+    assert client.get("/notifications/unread-count", headers=headers).json() == {"unread": 0}
+    client.post("/transactions/", json={**expense, "amount": 35.0}, headers=headers)
+    client.post("/transactions/", json={**expense, "amount": 5.0}, headers=headers)
+    client.post("/transactions/", json={**expense, "amount": 20.0}, headers=headers)
+
+    notifications = client.get("/notifications/", headers=headers).json()
+    assert [n["title"] for n in notifications] == ["Budget exceeded: Food", "Budget alert: Food"]
+    assert client.get("/notifications/unread-count", headers=headers).json() == {"unread": 2}
+
+    first_page = client.get("/notifications/?limit=1", headers=headers).json()
+    second_page = client.get(f"/notifications/?limit=1&before_id={first_page[0]['id']}", headers=headers).json()
+    assert [n["id"] for n in first_page + second_page] == [n["id"] for n in notifications]
+
+    response = client.post(f"/notifications/{notifications[0]['id']}/read", headers=headers)
+    assert response.json()["read"] is True
+    assert client.get("/notifications/unread-count", headers=headers).json() == {"unread": 1}
+    assert client.post("/notifications/999999/read", headers=headers).status_code == 404
+
+
+def test_unread_count_cache_is_bounded(monkeypatch):
+    """Test that the unread-count cache evicts the least recently used users."""
+    from app.routers import notifications
+
+    monkeypatch.setattr(settings, "UNREAD_COUNT_CACHE_SIZE", 2)
+    users = [_auth_headers(f"unread-lru-{index}@example.com") for index in range(3)]
+    for headers in users + users[2:]:
+        assert client.get("/notifications/unread-count", headers=headers).json() == {"unread": 0}
+    assert len(notifications._unread_counts) == 2
+
+
+def test_running_spend_follows_updates_and_deletes():
+    """Test that the running period spend matches the ledger after edits, moves and deletes."""
+    headers = _auth_headers("running-spend@example.com")
+    today = date.today()
+    client.post("/budgets/", json={"category": "Rent", "limit_amount": 1000.0, "period": "yearly"}, headers=headers)
+    expense = {"type": "expense", "category": "Rent", "date": today.isoformat()}
+    first = client.post("/transactions/", json={**expense, "amount": 300.0}, headers=headers).json()
+    second = client.post("/transactions/", json={**expense, "amount": 200.0}, headers=headers).json()
+    client.put(f"/transactions/{first['id']}", json={"amount": 350.0}, headers=headers)
+    client.put(f"/transactions/{second['id']}", json={"category": "Food"}, headers=headers)
+    client.post("/transactions/", json={**expense, "amount": 700.0, "date": date(today.year - 1, 6, 1).isoformat()},
+                headers=headers)
+    client.delete(f"/transactions/{first['id']}", headers=headers)
+    client.post("/transactions/", json={**expense, "amount": 120.0}, headers=headers)
+
+    db = TestingSessionLocal()
+    rows = {
+        row.period_start.year: row.spent
+        for row in db.query(models.BudgetSpend).join(
+            models.User, models.User.id == models.BudgetSpend.user_id
+        ).filter(models.User.email == "running-spend@example.com")
+    }
+    db.close()
+    assert rows == {today.year: 120.0, today.year - 1: 700.0}
+    assert client.get("/notifications/", headers=headers).json() == []
+
+
+def test_running_spend_resets_when_budget_is_recreated():
+    """Test that expenses written while no budget existed count once the budget is back."""
+    headers = _auth_headers("recreated-budget@example.com")
+    budget = {"category": "Food", "limit_amount": 100.0, "period": "monthly"}
+    expense = {"type": "expense", "category": "Food", "date": date.today().isoformat()}
+    budget_id = client.post("/budgets/", json=budget, headers=headers).json()["id"]
+    client.post("/transactions/", json={**expense, "amount": 10.0}, headers=headers)
+    client.delete(f"/budgets/{budget_id}", headers=headers)
+    client.post("/transactions/", json={**expense, "amount": 85.0}, headers=headers)
+    client.post("/budgets/", json=budget, headers=headers)
+    client.post("/transactions/", json={**expense, "amount": 10.0}, headers=headers)
+
+    db = TestingSessionLocal()
+    spent = [
+        row.spent for row in db.query(models.BudgetSpend).join(
+            models.User, models.User.id == models.BudgetSpend.user_id
+        ).filter(models.User.email == "recreated-budget@example.com")
+    ]
+    db.close()
+    assert spent == [105.0]
+    titles = [n["title"] for n in client.get("/notifications/", headers=headers).json()]
+    assert titles == ["Budget exceeded: Food"]
+
+
+# ============= Goal Contribution Tests =============
+
+
+def test_goal_contributions_update_progress():
+    """Test that contributions move current_amount and completed, and that reverting them undoes it."""
+    headers = _auth_headers("contributions@example.com")
+    deadline = date.today() + timedelta(days=30)
+    goal = client.post(
+        "/goals/", json={"name": "Bike", "target_amount": 500.0, "deadline": deadline.isoformat()}, headers=headers
+    ).json()
+    transaction = client.post("/transactions/", json={
+        "amount": 300.0, "type": "expense", "category": "Savings", "date": date.today().isoformat(),
+    }, headers=headers).json()
+
+    first = client.post(f"/goals/{goal['id']}/contributions", json={"amount": 200.0}, headers=headers)
+    assert first.status_code == 201
+    client.post(
+        f"/goals/{goal['id']}/contributions", json={"amount": 300.0, "transaction_id": transaction["id"]},
+        headers=headers,
+    )
+    updated = client.get(f"/goals/{goal['id']}", headers=headers).json()
+    assert updated["current_amount"] == 500.0
+    assert updated["completed"] is True
+
+    progress = client.get("/reports/goals", headers=headers).json()["Bike"]
+    assert progress == {"target": 500.0, "current": 500.0, "percentage": 100.0, "completed": True, "days_left": 30}
+
+    client.delete(f"/transactions/{transaction['id']}", headers=headers)
+    updated = client.get(f"/goals/{goal['id']}", headers=headers).json()
+    assert updated["current_amount"] == 200.0
+    assert updated["completed"] is False
+    assert len(client.get(f"/goals/{goal['id']}/contributions", headers=headers).json()) == 1
+
+    response = client.delete(f"/goals/{goal['id']}/contributions/{first.json()['id']}", headers=headers)
+    assert response.status_code == 204
+    assert client.get(f"/goals/{goal['id']}", headers=headers).json()["current_amount"] == 0.0
+    assert client.post("/goals/999999/contributions", json={"amount": 1.0}, headers=headers).status_code == 404
+
+
+def test_goal_progress_only_moves_through_contributions():
+    """Test that PUT cannot overwrite progress and that linked contributions follow their transaction."""
+    headers = _auth_headers("contributions-ledger@example.com")
+    deadline = date.today() + timedelta(days=30)
+    goal = client.post(
+        "/goals/", json={"name": "Laptop", "target_amount": 500.0, "deadline": deadline.isoformat()}, headers=headers
+    ).json()
+    transaction = client.post("/transactions/", json={
+        "amount": 100.0, "type": "expense", "category": "Savings", "date": date.today().isoformat(),
+    }, headers=headers).json()
+    contribution = client.post(
+        f"/goals/{goal['id']}/contributions", json={"amount": 100.0, "transaction_id": transaction["id"]},
+        headers=headers,
+    ).json()
+
+    response = client.put(f"/goals/{goal['id']}", json={"current_amount": 0.0}, headers=headers)
+    assert response.status_code == 422
+
+    client.put(f"/transactions/{transaction['id']}", json={"amount": 150.0}, headers=headers)
+    contributions = client.get(f"/goals/{goal['id']}/contributions", headers=headers).json()
+    assert [entry["amount"] for entry in contributions] == [150.0]
+    assert client.get(f"/goals/{goal['id']}", headers=headers).json()["current_amount"] == 150.0
+
+    client.delete(f"/goals/{goal['id']}/contributions/{contribution['id']}", headers=headers)
+    assert client.get(f"/goals/{goal['id']}", headers=headers).json()["current_amount"] == 0.0
+    assert client.get("/goals/", headers=headers).status_code == 200
+    assert client.get("/reports/goals", headers=headers).json()["Laptop"]["percentage"] == 0.0
+
+
+# ============= Multi-currency Tests =============
+
+
+def test_reports_convert_foreign_amounts_with_historical_rates(tmp_path):
+    """Test that reports convert each transaction at its day's rate, forward-filling gaps."""
+    from app.services.fx import load_rate_history
+
+    rates = tmp_path / "rates.csv"
+    rates.write_text("date,currency,rate\n2024-03-01,EUR,0.8\n2024-03-03,EUR,0.5\n")
+    db = TestingSessionLocal()
+    assert load_rate_history(db, str(rates)) == 3
+    db.close()
+
+    headers = _auth_headers("multi-currency@example.com")
+    expense = {"type": "expense", "category": "Travel", "date": "2024-03-01"}
+    for amount, currency, day in [(80.0, "EUR", "2024-03-01"), (50.0, None, "2024-03-01"),
+                                  (40.0, "EUR", "2024-03-02"), (79.0, "GBP", "2024-03-01")]:
+        client.post("/transactions/", json={**expense, "amount": amount, "currency": currency, "date": day},
+                    headers=headers)
+
+    assert client.get("/reports/category", headers=headers).json() == {"Travel": pytest.approx(300.0)}
+    assert client.get("/reports/monthly", headers=headers).json() == {
+        "2024-03": {"income": 0.0, "expenses": pytest.approx(300.0)}
+    }
+    summary = client.get("/dashboard", headers=headers).json()
+    assert summary["total_expenses"] == pytest.approx(300.0)
+    assert summary["transaction_count"] == 4
+
+    # New rates change converted figures, so cached copies must not be revalidated.
+    etag = client.get("/reports/category", headers=headers).headers["etag"]
+    rates.write_text("date,currency,rate\n2024-03-01,EUR,0.4\n2024-03-03,EUR,0.5\n")
+    db = TestingSessionLocal()
+    load_rate_history(db, str(rates))
+    db.close()
+    response = client.get("/reports/category", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_currencies_without_rates_are_rejected(tmp_path):
+    """Test that a currency with neither a built-in nor a stored rate cannot be written."""
+    from app.services.fx import load_rate_history
+
+    headers = _auth_headers("unknown-currency@example.com")
+    expense = {"amount": 85.0, "type": "expense", "category": "Food", "date": "2024-03-01", "currency": "SEK"}
+    response = client.post("/transactions/", json=expense, headers=headers)
+    assert response.status_code == 422
+    assert client.get("/dashboard", headers=headers).json()["total_expenses"] == 0.0
+
+    rates = tmp_path / "rates.csv"
+    rates.write_text("date,currency,rate\n2024-03-01,SEK,10.0\n")
+    db = TestingSessionLocal()
+    load_rate_history(db, str(rates))
+    db.close()
+    assert client.post("/transactions/", json=expense, headers=headers).status_code == 201
+    assert client.get("/dashboard", headers=headers).json()["total_expenses"] == pytest.approx(8.5)
+
+
+def test_budget_alerts_convert_foreign_amounts():
+    """Test that budget alerts count foreign expenses in the user's currency, as reports do."""
+    headers = _auth_headers("alerts-currency@example.com")
+    client.post("/budgets/", json={"category": "Food", "limit_amount": 1.0, "period": "monthly"}, headers=headers)
+    expense = {"amount": 100.0, "type": "expense", "category": "Food", "currency": "JPY", "date": str(date.today())}
+
+    client.post("/transactions/", json=expense, headers=headers)
+    assert client.get("/notifications/", headers=headers).json() == []
+    spent = client.get("/reports/budgets", headers=headers).json()["Food"]["spent"]
+    assert spent == pytest.approx(100.0 / 149.5)
+
+    client.post("/transactions/", json=expense, headers=headers)
+    titles = [notification["title"] for notification in client.get("/notifications/", headers=headers).json()]
+    assert titles == ["Budget exceeded: Food"]
@@ -0,0 +1,14 @@
+from app.services.scraper import FinancialScraper, PARSERS
+from benchmarks.sanitize import statement_html
+
+
+def test_sanitize_parsers_agree_and_batches_keep_order():
+    """Test that every parser yields the same text and that batching preserves order."""
+    scraper = FinancialScraper()
+    html = "<html><head><style>p{}</style></head><body><p>Paid <b>$12.50</b></p><script>x()</script></body></html>"
+    assert {scraper.sanitize_html(html, parser) for parser in PARSERS} == {"Paid $12.50"}
+    assert scraper.sanitize_html("") == ""
+
+    documents = [statement_html(5, seed) for seed in range(12)]
+    expected = [scraper.sanitize_html(document, "html5lib") for document in documents]
+    assert scraper.sanitize_many(documents, workers=2, chunksize=4) == expected
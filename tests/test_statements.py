@@ -0,0 +1,40 @@
+import io
+from datetime import date
+
+from app.services.statements import AmountParser, DateParser, StatementParser, transaction_rows
+
+
+def test_amounts_and_dates_across_locales():
+    """Test separators, negative notations and currency markers per locale."""
+    assert AmountParser("en").find_all("$1,234.56 (45.00) -€12 99.90- USD 7") == [1234.56, -45.0, -12.0, -99.9, 7.0]
+    assert AmountParser("de").find_all("-1.234,56 € (12,00)") == [-1234.56, -12.0]
+    assert AmountParser("fr").parse("1 234,56 €") == 1234.56
+
+    assert DateParser().parse("posted 03/15/2024") == date(2024, 3, 15)
+    assert DateParser(day_first=True).parse("15.03.24") == date(2024, 3, 15)
+    assert DateParser().parse("Mar 5, 2024") == DateParser().parse("5 March 2024") == date(2024, 3, 5)
+    assert DateParser().parse("2024-02-30") is None
+
+
+def test_statement_rows_from_csv_html_and_text():
+    """Test that every statement format yields the same rows."""
+    parser = StatementParser()
+    expected = [(date(2024, 3, 1), "Coffee", -4.5), (date(2024, 3, 2), "Salary", 2000.0)]
+
+    csv_lines = ["Date,Description,Debit,Credit,Balance", "03/01/2024,Coffee,4.50,,95.50",
+                 "03/02/2024,Salary,,\"2,000.00\",\"2,095.50\"", "Closing balance,,,,\"2,095.50\""]
+    assert [tuple(row) for row in parser.csv_rows(csv_lines)] == expected
+
+    html = (b"<html><body><table><tr><th>Date</th><th>Details</th><th>Amount</th></tr>"
+            b"<tr><td>2024-03-01</td><td>Coffee</td><td>(4.50)</td></tr>"
+            b"<tr><td>2024-03-02</td><td><b>Salary</b></td><td>$2,000.00</td></tr></table></body></html>")
+    assert [tuple(row) for row in parser.html_rows(io.BytesIO(html))] == expected
+
+    text = ["Statement 2024", "2024-03-01  Coffee      -4.50     95.50",
+            "2024-03-02  Salary   2,000.00  2,095.50", "Page 1 of 1"]
+    assert [tuple(row) for row in parser.text_rows(text)] == expected
+
+    rows = list(transaction_rows("user", parser.text_rows(text), currency="EUR"))
+    assert [(row["type"], row["amount"], row["currency"]) for row in rows] == [
+        ("expense", 4.5, "EUR"), ("income", 2000.0, "EUR"),
+    ]